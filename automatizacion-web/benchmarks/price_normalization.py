@@ -0,0 +1,51 @@
+import argparse, time
+import numpy as np
+import pandas as pd
+from web_pipeline.processor import normalize_price, normalize_price_series
+
+# Columna sintética con los formatos de precio que mandan los proveedores
+def make_prices(rows: int, seed: int = 0) -> pd.Series:
+    rng = np.random.default_rng(seed)
+    v = rng.uniform(10, 500_000, rows).round(2)
+    ent = np.floor(v).astype(np.int64)
+    dec = np.round((v - ent) * 100).astype(np.int64)
+    miles = pd.Series(ent).map("{:,}".format)
+    dec = pd.Series(dec).map("{:02d}".format)
+    fmt = rng.integers(0, 5, rows)
+    s = np.select(
+        [fmt == 0, fmt == 1, fmt == 2, fmt == 3],
+        [
+            ("$ " + miles.str.replace(",", ".", regex=False) + "," + dec).to_numpy(dtype=object),  # 1.234,56
+            (miles + "." + dec).to_numpy(dtype=object),                                              # 1,234.56
+            (pd.Series(ent).astype(str) + "," + dec).to_numpy(dtype=object),                         # 1234,56
+            v.astype(object),                                                                        # float nativo
+        ],
+        default="s/p",
+    )
+    return pd.Series(s, dtype=object)
+
+def _timeit(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter(); fn(); best = min(best, time.perf_counter() - t0)
+    return best
+
+if __name__ == "__main__":
+    a = argparse.ArgumentParser(description="Benchmark normalize_price (por celda) vs normalize_price_series (columna)")
+    a.add_argument("--rows", type=int, default=3_000_000)
+    a.add_argument("--repeat", type=int, default=1)
+    args = a.parse_args()
+
+    s = make_prices(args.rows)
+    print(f"[BENCH] {args.rows:,} filas")
+
+    t_apply = _timeit(lambda: s.apply(normalize_price), args.repeat)
+    t_vec = _timeit(lambda: normalize_price_series(s), args.repeat)
+
+    exp = pd.to_numeric(s.apply(normalize_price), errors="coerce").to_numpy(dtype="float64")
+    got = normalize_price_series(s).to_numpy()
+    same = np.array_equal(exp, got, equal_nan=True)
+
+    print(f"[BENCH] apply(normalize_price)   {t_apply:8.3f} s")
+    print(f"[BENCH] normalize_price_series   {t_vec:8.3f} s  (x{t_apply / t_vec:.1f})")
+    print(f"[BENCH] resultados idénticos: {same}")
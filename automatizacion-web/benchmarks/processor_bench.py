@@ -0,0 +1,110 @@
+import os, sys, json, time, argparse, platform, tempfile
+import multiprocessing as mp
+from datetime import datetime
+import pandas as pd
+from benchmarks.synthetic import generate_all
+
+# Benchmark de processor.py sobre archivos sintéticos: mide smart_read, cada
+# process_* y save_xlsx. Cada medición corre en un proceso nuevo (spawn) para que
+# el pico de memoria sea el de esa etapa y no el acumulado. Resultado en JSON;
+# con --baseline se compara contra una corrida anterior.
+
+STAGES = ["smart_read", "process", "save_xlsx"]
+
+def _peak_rss_mb():
+    try:
+        import resource
+        kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return kb / (1 << 20) if sys.platform == "darwin" else kb / 1024  # macOS informa bytes
+    except ImportError:
+        try:
+            import psutil
+            return psutil.Process().memory_info().peak_wset / (1 << 20)
+        except (ImportError, AttributeError):
+            return None
+
+# Corre una etapa en el proceso hijo y devuelve sus métricas
+def _measure(supplier, stage, path, outdir):
+    from openpyxl import load_workbook
+    from web_pipeline import processor as P
+    proc = P.processor_for(supplier)
+    base = _peak_rss_mb()
+    if stage == "smart_read":
+        sheet = None
+        if proc is P.process_autofix:
+            wb = load_workbook(path, read_only=True)
+            sheet = wb.sheetnames[0]; wb.close()
+        t = time.perf_counter(); df = P.smart_read(path, sheet); secs = time.perf_counter() - t
+    elif stage == "process":
+        t = time.perf_counter(); df = proc(path); secs = time.perf_counter() - t
+    else:
+        df = proc(path)
+        base = _peak_rss_mb()
+        t = time.perf_counter(); P.save_xlsx(df, outdir, supplier); secs = time.perf_counter() - t
+    peak = _peak_rss_mb()
+    return {"supplier": supplier, "stage": stage, "function": proc.__name__ if stage == "process" else stage,
+            "seconds": round(secs, 4), "rows_out": len(df), "input_mb": round(os.path.getsize(path) / (1 << 20), 2),
+            "peak_rss_mb": None if peak is None else round(peak, 1),
+            "rss_growth_mb": None if peak is None or base is None else round(peak - base, 1)}
+
+def run(files: dict, repeat: int = 1) -> list:
+    results = []
+    ctx = mp.get_context("spawn")
+    with tempfile.TemporaryDirectory() as outdir:
+        for supplier, path in files.items():
+            for stage in STAGES:
+                runs = []
+                for _ in range(repeat):
+                    with ctx.Pool(1) as pool:
+                        runs.append(pool.apply(_measure, (supplier, stage, path, outdir)))
+                best = min(runs, key=lambda r: r["seconds"])
+                best["peak_rss_mb"] = max((r["peak_rss_mb"] or 0) for r in runs) or None
+                results.append(best)
+                print(f"[BENCH] {supplier:<22} {best['function']:<32} {best['seconds']:8.3f} s  "
+                      f"{best['rows_out']:>9,} filas  pico {best['peak_rss_mb'] or '-'} MB")
+    return results
+
+# Compara contra una corrida previa; devuelve las etapas más lentas que el umbral
+def compare(results: list, baseline_path: str, threshold: float = 1.2) -> list:
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        prev = {(r["supplier"], r["stage"]): r for r in json.load(f)["results"]}
+    slower = []
+    for r in results:
+        p = prev.get((r["supplier"], r["stage"]))
+        if not p or not p["seconds"]:
+            continue
+        ratio = r["seconds"] / p["seconds"]
+        flag = "REGRESION" if ratio > threshold else ""
+        print(f"[BENCH] {r['supplier']:<22} {r['function']:<32} {p['seconds']:8.3f} -> {r['seconds']:8.3f} s (x{ratio:.2f}) {flag}")
+        if flag:
+            slower.append(r)
+    return slower
+
+if __name__ == "__main__":
+    a = argparse.ArgumentParser(description="Benchmark de processor.py con listas sintéticas")
+    a.add_argument("--rows", type=int, default=100_000)
+    a.add_argument("--sheets", type=int, default=5)
+    a.add_argument("--seed", type=int, default=0)
+    a.add_argument("--repeat", type=int, default=1)
+    a.add_argument("--data_dir", default="./data/bench")
+    a.add_argument("--out", default=None)
+    a.add_argument("--baseline", default=None)
+    a.add_argument("--threshold", type=float, default=1.2)
+    args = a.parse_args()
+
+    files = generate_all(args.data_dir, args.rows, args.sheets, args.seed)
+    print(f"[BENCH] {args.rows:,} filas por proveedor, Autofix en {args.sheets} hojas")
+    results = run(files, args.repeat)
+
+    out = args.out or os.path.join(args.data_dir, f"bench_{datetime.now().strftime('%Y-%m-%d_%H%M%S')}.json")
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump({
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "params": {"rows": args.rows, "sheets": args.sheets, "seed": args.seed, "repeat": args.repeat},
+            "env": {"python": platform.python_version(), "pandas": pd.__version__, "platform": platform.platform(),
+                    "cpus": os.cpu_count()},
+            "results": results,
+        }, f, ensure_ascii=False, indent=1)
+    print(f"[BENCH] resultados -> {out}")
+    if args.baseline and compare(results, args.baseline, args.threshold):
+        sys.exit(1)
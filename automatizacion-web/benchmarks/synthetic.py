@@ -0,0 +1,93 @@
+import os, argparse
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+from benchmarks.price_normalization import make_prices
+
+# Archivos sintéticos con el formato de cada proveedor, para medir processor.py
+# sin depender de la web:
+#   Autorepuestos Express: XLSX con filas basura arriba del encabezado
+#   Autofix: XLSX con una hoja por marca (CODIGO, DESCR, DESCR2, CODRUB, PRECIO)
+#   Mundo Repcar: CSV con ';' en latin-1
+
+RUBROS = ["Motor", "Frenos", "Encendido", "Suspensión", "Filtros", "Embrague", ""]
+MARCAS = ["BOSCH", "SH", "NGK", "FRAM", "MAHLE", "VALEO", "CORVEN", "FERODO"]
+PIEZAS = ["Bujía", "Filtro aceite", "Pastilla freno", "Amortiguador", "Correa distribución", "Bomba agua", "Embrague kit"]
+
+def _pick(rng, values, n):
+    return np.asarray(values, dtype=object)[rng.integers(0, len(values), n)]
+
+def _descriptions(rng, n):
+    d = pd.Series(_pick(rng, PIEZAS, n)) + " " + pd.Series(rng.integers(100, 99_999, n)).astype(str)
+    long = rng.random(n) < 0.01  # algunas descripciones de más de 100 caracteres
+    d[long] = d[long] + " " + "x" * 110
+    return d.to_numpy(dtype=object)
+
+# Prefijo de filas "basura" (título, fecha, vacías) como en las listas reales
+def _junk_rows(title):
+    return [[title], [], ["Fecha:", "2024-01-01"], ["Lista de precios sujeta a cambios"], []]
+
+def make_autorepuestos_express(path, rows=100_000, seed=0):
+    rng = np.random.default_rng(seed)
+    codes = pd.Series(rng.integers(1, 999_999, rows)).map("{:06d}".format).to_numpy(dtype=object)
+    desc, rubro = _descriptions(rng, rows), _pick(rng, RUBROS, rows)
+    price, marca = make_prices(rows, seed).to_numpy(dtype=object), _pick(rng, MARCAS, rows)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Lista")
+    for r in _junk_rows("AUTOREPUESTOS EXPRESS"):
+        ws.append(r)
+    ws.append(["Codigo Proveedor", "Descripcion", "Rubro", "Precio de Lista", "Marca", "Observ"])
+    for row in zip(codes, desc, rubro, price, marca):
+        ws.append(list(row) + [None])
+    wb.save(path)
+    return path
+
+def make_autofix(path, rows=100_000, sheets=5, seed=0):
+    rng = np.random.default_rng(seed)
+    per = max(1, rows // max(1, sheets))
+    wb = Workbook(write_only=True)
+    for s in range(sheets):
+        ws = wb.create_sheet(MARCAS[s % len(MARCAS)] + ("" if s < len(MARCAS) else f" {s}"))
+        ws.append(["Lista Autofix"]); ws.append([])
+        ws.append(["CODIGO", "DESCR", "DESCR2", "CODRUB", "PRECIO"])
+        codes = pd.Series(rng.integers(1, 99_999, per)).map("AF{:05d}".format).to_numpy(dtype=object)
+        d1, d2 = _descriptions(rng, per), _pick(rng, ["del.", "tras.", "izq.", "der.", None], per)
+        rub, price = rng.integers(1, 400, per), make_prices(per, seed + s).to_numpy(dtype=object)
+        for row in zip(codes, d1, d2, rub.tolist(), price):
+            ws.append(list(row))
+    wb.save(path)
+    return path
+
+def make_mundo_repcar(path, rows=100_000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "Codigo Articulo": pd.Series(rng.integers(1, 999_999, rows)).map("MR{:06d}".format),
+        "Cod Fabrica": pd.Series(rng.integers(1, 999_999, rows)).map("F{:06d}".format),
+        "Marca": _pick(rng, MARCAS, rows),
+        "Descripcion": _descriptions(rng, rows),
+        "Rubro": _pick(rng, RUBROS, rows),
+        "Importe": make_prices(rows, seed),
+    })
+    with open(path, "w", encoding="latin-1", newline="") as f:
+        f.write("Lista Mundo Repcar;;;;;\n;;;;;\n")
+        df.to_csv(f, sep=";", index=False)
+    return path
+
+# Genera los tres archivos en outdir; devuelve {proveedor: ruta}
+def generate_all(outdir, rows=100_000, sheets=5, seed=0) -> dict:
+    os.makedirs(outdir, exist_ok=True)
+    return {
+        "Autorepuestos Express": make_autorepuestos_express(os.path.join(outdir, "autorepuestos_express.xlsx"), rows, seed),
+        "Autofix": make_autofix(os.path.join(outdir, "autofix.xlsx"), rows, sheets, seed),
+        "Mundo Repcar": make_mundo_repcar(os.path.join(outdir, "mundo_repcar.csv"), rows, seed),
+    }
+
+if __name__ == "__main__":
+    a = argparse.ArgumentParser(description="Genera listas sintéticas con el formato de cada proveedor")
+    a.add_argument("--outdir", default="./data/bench")
+    a.add_argument("--rows", type=int, default=100_000)
+    a.add_argument("--sheets", type=int, default=5)
+    a.add_argument("--seed", type=int, default=0)
+    args = a.parse_args()
+    for name, path in generate_all(args.outdir, args.rows, args.sheets, args.seed).items():
+        print(f"[GEN] {name}: {path} ({os.path.getsize(path) / (1 << 20):.1f} MB)")
@@ -1,18 +1,74 @@
 import os, argparse, json
-from web_pipeline.downloader import download_all
-from web_pipeline.processor import process_and_save
-from web_pipeline.uploader import upload_file
+from web_pipeline.downloader import download_all, COOKIE_JAR
+from web_pipeline.direct import HTTP_WORKERS
+from web_pipeline.processor import process_and_save, STREAM_CHUNKSIZE
+from web_pipeline.uploader import Uploader, UPLOAD_LEDGER, UPLOAD_RETRIES
+from web_pipeline.cache import ProcessingCache, CACHE_DIR, CACHE_MAX_MB, CACHE_MAX_DAYS
+from web_pipeline.delta import STATE_DIR, pending_rows, commit_snapshot, discard_snapshot, discard_pending
+from web_pipeline.pipeline import run_pipeline, QUEUE_SIZE, UPLOAD_WORKERS
+from web_pipeline.validation import ValidationBatch
+from web_pipeline.writers import parse_formats
+from web_pipeline import metrics
+from web_pipeline.metrics import METRICS_FILE
 
-def run(credentials, download_dir, outdir, headless=True, upload=False, api_url=None):
+def run(credentials, download_dir, outdir, headless=True, upload=False, api_url=None, workers=1, stream=False, chunksize=STREAM_CHUNKSIZE,
+        cache=True, cache_dir=CACHE_DIR, cache_max_mb=CACHE_MAX_MB, cache_max_days=CACHE_MAX_DAYS,
+        delta=False, state_dir=STATE_DIR, queue_size=QUEUE_SIZE, upload_workers=UPLOAD_WORKERS,
+        drivers=1, direct=False, http_workers=HTTP_WORKERS, chromedriver=None, profile_dir=None,
+        cookie_jar=COOKIE_JAR, keep_driver=False, upload_retries=UPLOAD_RETRIES, upload_ledger=UPLOAD_LEDGER,
+        validate=True, strict=False, output_format="xlsx", compact=False, metrics_file=METRICS_FILE, prom_file=None):
     api_url = api_url or "https://desafio.somosait.com/api/upload/"
+    m = metrics.configure(metrics_file or None, prom_file or None)
     os.makedirs(download_dir,exist_ok=True); os.makedirs(outdir,exist_ok=True)
-    items = download_all(credentials, download_dir, headless=headless)
-    for name, in_path in items:
-        out_path = process_and_save(name, in_path, outdir)
-        print(f"[PROCESADO] -> {out_path}")
-        if upload:
-            code,resp = upload_file(api_url, out_path)
-            print(f"[UPLOAD] {os.path.basename(out_path)} -> status={code} resp={resp}")
+    pcache = ProcessingCache(cache_dir, cache_max_mb, cache_max_days) if cache else None
+    formats = parse_formats(output_format)
+    if upload:
+        # la API recibe XLSX: se genera siempre y es el archivo que se sube
+        formats = ["xlsx"] + [f for f in formats if f != "xlsx"]
+    items = download_all(credentials, download_dir, headless=headless, drivers=drivers,
+                         direct=direct, http_workers=http_workers, driver_path=chromedriver,
+                         profile_dir=profile_dir, cookie_jar=cookie_jar, keep_driver=keep_driver)
+    batch = ValidationBatch(strict) if validate else None
+
+    def process(name, in_path):
+        report = batch.new(name) if batch else None
+        out_path = process_and_save(name, in_path, outdir, workers=workers, stream=stream, chunksize=chunksize,
+                                    cache=pcache, delta_dir=state_dir if delta else None, report=report,
+                                    formats=formats, compact=compact)
+        if report is not None and not report.ok(strict):
+            print(f"[VALIDACION] {report.summary()} -> no se sube {os.path.basename(out_path)}")
+            discard_snapshot(out_path)
+            return None
+        if pending_rows(out_path) == 0:
+            print(f"[DELTA] {os.path.basename(out_path)} sin cambios -> no se sube")
+            commit_snapshot(out_path)
+            return None
+        if not upload:
+            commit_snapshot(out_path)
+        return out_path
+
+    uploader = Uploader(api_url, max_workers=upload_workers, retries=upload_retries, ledger=upload_ledger) if upload else None
+
+    # el snapshot del delta avanza solo si la subida salió bien
+    def send(path):
+        code, resp = uploader.upload(path)
+        if code is not None and 200 <= code < 300:
+            commit_snapshot(path)
+        else:
+            discard_snapshot(path)
+        return code, resp
+
+    try:
+        return run_pipeline(items, process, send if uploader else None,
+                            queue_size=queue_size, upload_workers=upload_workers)
+    finally:
+        discard_pending()
+        if batch:
+            print(f"[VALIDACION] reporte -> {batch.write(outdir)}")
+        m.report()
+        m.close()
+        if metrics_file: print(f"[METRICAS] {metrics_file} (run_id={m.run_id})")
+        if prom_file: print(f"[METRICAS] Prometheus -> {prom_file}")
 
 if __name__=="__main__":
     a=argparse.ArgumentParser()
@@ -22,5 +78,38 @@ if __name__=="__main__":
     a.add_argument("--headless",type=lambda x:x.lower()=="true",default=True)
     a.add_argument("--upload",type=lambda x:x.lower()=="true",default=False)
     a.add_argument("--api_url",default=None)
+    a.add_argument("--workers",type=int,default=1)
+    a.add_argument("--stream",type=lambda x:x.lower()=="true",default=False)
+    a.add_argument("--chunksize",type=int,default=STREAM_CHUNKSIZE)
+    a.add_argument("--cache",type=lambda x:x.lower()=="true",default=True)
+    a.add_argument("--cache_dir",default=CACHE_DIR)
+    a.add_argument("--cache_max_mb",type=float,default=CACHE_MAX_MB)
+    a.add_argument("--cache_max_days",type=float,default=CACHE_MAX_DAYS)
+    a.add_argument("--delta",type=lambda x:x.lower()=="true",default=False)
+    a.add_argument("--state_dir",default=STATE_DIR)
+    a.add_argument("--queue_size",type=int,default=QUEUE_SIZE)
+    a.add_argument("--upload_workers",type=int,default=UPLOAD_WORKERS)
+    a.add_argument("--drivers",type=int,default=1)
+    a.add_argument("--direct",type=lambda x:x.lower()=="true",default=False)
+    a.add_argument("--http_workers",type=int,default=HTTP_WORKERS)
+    a.add_argument("--chromedriver",default=None)
+    a.add_argument("--profile_dir",default=None)
+    a.add_argument("--cookie_jar",default=COOKIE_JAR)
+    a.add_argument("--upload_retries",type=int,default=UPLOAD_RETRIES)
+    a.add_argument("--upload_ledger",default=UPLOAD_LEDGER)
+    a.add_argument("--validate",type=lambda x:x.lower()=="true",default=True)
+    a.add_argument("--strict",type=lambda x:x.lower()=="true",default=False)
+    a.add_argument("--output_format",default="xlsx")
+    a.add_argument("--compact",type=lambda x:x.lower()=="true",default=False)
+    a.add_argument("--metrics_file",default=METRICS_FILE)
+    a.add_argument("--prom_file",default=None)
     args=a.parse_args()
-    run(args.credentials,args.download_dir,args.outdir,headless=args.headless,upload=args.upload,api_url=args.api_url)
+    run(args.credentials,args.download_dir,args.outdir,headless=args.headless,upload=args.upload,api_url=args.api_url,workers=args.workers,
+        stream=args.stream,chunksize=args.chunksize,cache=args.cache,cache_dir=args.cache_dir,
+        cache_max_mb=args.cache_max_mb,cache_max_days=args.cache_max_days,
+        delta=args.delta,state_dir=args.state_dir,queue_size=args.queue_size,upload_workers=args.upload_workers,
+        drivers=args.drivers,direct=args.direct,http_workers=args.http_workers,
+        chromedriver=args.chromedriver,profile_dir=args.profile_dir,cookie_jar=args.cookie_jar,
+        upload_retries=args.upload_retries,upload_ledger=args.upload_ledger,
+        validate=args.validate,strict=args.strict,output_format=args.output_format,
+        compact=args.compact,metrics_file=args.metrics_file,prom_file=args.prom_file)
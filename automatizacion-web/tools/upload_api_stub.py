@@ -0,0 +1,80 @@
+import io, json, hashlib, argparse, threading
+from email import message_from_bytes
+from email.policy import default as email_policy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pandas as pd
+
+# Servidor local que imita el contrato de /api/upload/ para probar el uploader
+# sin tocar la API real: multipart con campo "file"; 400 "Missing required columns"
+# si faltan CODIGO/DESCRIPCIÓN/MARCA/PRECIO; 200 con "link" si está todo.
+# --fail_first N responde 503 a las primeras N subidas (para probar reintentos).
+
+REQUIRED = ["CODIGO", "DESCRIPCIÓN", "MARCA", "PRECIO"]
+
+def _file_field(content_type: str, body: bytes):
+    msg = message_from_bytes(b"Content-Type: " + content_type.encode() + b"\r\n\r\n" + body, policy=email_policy)
+    for part in msg.iter_parts():
+        if part.get_param("name", header="content-disposition") == "file":
+            return part.get_filename(), part.get_payload(decode=True)
+    return None, None
+
+def make_handler(fail_first: int = 0, delay: float = 0.0):
+    state = {"fail": fail_first, "posts": 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *a):
+            pass
+
+        def _json(self, code, data):
+            body = json.dumps(data, ensure_ascii=False).encode()
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            if not self.path.rstrip("/").endswith("/api/upload"):
+                return self._json(404, {"error": "Not found"})
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            with lock:
+                state["posts"] += 1
+                fail = state["fail"] > 0
+                state["fail"] -= fail
+            if delay:
+                threading.Event().wait(delay)
+            if fail:
+                return self._json(503, {"error": "Service unavailable"})
+            name, data = _file_field(self.headers.get("Content-Type", ""), body)
+            if data is None:
+                return self._json(400, {"error": "No file provided"})
+            try:
+                cols = [str(c).strip() for c in pd.read_excel(io.BytesIO(data), nrows=0).columns]
+            except Exception:
+                return self._json(400, {"error": "Invalid file"})
+            missing = [c for c in REQUIRED if c not in cols]
+            if missing:
+                return self._json(400, {"error": "Missing required columns", "missing": missing})
+            sha = hashlib.sha256(data).hexdigest()
+            self._json(200, {"message": "File uploaded", "file": name,
+                             "link": f"https://drive.google.com/file/d/{sha[:33]}/view"})
+
+    Handler.state = state
+    return Handler
+
+# Levanta el servidor en un hilo; devuelve (server, url de la API)
+def serve(port: int = 0, fail_first: int = 0, delay: float = 0.0):
+    srv = ThreadingHTTPServer(("127.0.0.1", port), make_handler(fail_first, delay))
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv, f"http://127.0.0.1:{srv.server_port}/api/upload/"
+
+if __name__ == "__main__":
+    a = argparse.ArgumentParser(description="API de subida local (stand-in de /api/upload/)")
+    a.add_argument("--port", type=int, default=8000)
+    a.add_argument("--fail_first", type=int, default=0)
+    a.add_argument("--delay", type=float, default=0.0)
+    args = a.parse_args()
+    srv = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(args.fail_first, args.delay))
+    print(f"[STUB] http://127.0.0.1:{srv.server_port}/api/upload/")
+    srv.serve_forever()
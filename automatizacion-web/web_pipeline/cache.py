@@ -0,0 +1,141 @@
+import os, time, hashlib, importlib.util
+import pandas as pd
+
+# Caché de listas procesadas: clave = hash del archivo original + versión del
+# procesador; valor = resultado normalizado en Parquet. Si el proveedor no
+# cambió su lista, no hace falta volver a leer el XLSX/CSV.
+
+CACHE_DIR = "./data/cache"
+CACHE_MAX_MB = 500
+CACHE_MAX_DAYS = 30
+
+# Hashes ya calculados al descargar (ruta, tamaño, mtime) -> sha256
+_KNOWN_DIGESTS = {}
+
+def _stat_key(path: str):
+    st = os.stat(path)
+    return os.path.abspath(path), st.st_size, st.st_mtime_ns
+
+# Registra el sha256 calculado mientras se descargaba el archivo
+def remember_digest(path: str, digest: str):
+    _KNOWN_DIGESTS[_stat_key(path)] = digest
+
+# Hash sha256 del contenido del archivo (leído por bloques)
+def file_digest(path: str, block: int = 1 << 20) -> str:
+    known = _KNOWN_DIGESTS.get(_stat_key(path))
+    if known:
+        return known
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for b in iter(lambda: f.read(block), b""):
+            h.update(b)
+    return h.hexdigest()
+
+def _schema():
+    import pyarrow as pa
+    return pa.schema([("CODIGO", pa.string()), ("DESCRIPCIÓN", pa.string()),
+                      ("MARCA", pa.string()), ("PRECIO", pa.float64())])
+
+class ProcessingCache:
+    def __init__(self, cache_dir: str = CACHE_DIR, max_mb: float = CACHE_MAX_MB, max_days: float = CACHE_MAX_DAYS):
+        self.cache_dir = cache_dir
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.max_age = max_days * 86400
+        self.enabled = importlib.util.find_spec("pyarrow") is not None
+        if not self.enabled:
+            print("[CACHE] pyarrow no está instalado: caché deshabilitada")
+            return
+        os.makedirs(cache_dir, exist_ok=True)
+        self.evict()
+
+    # Clave de caché para un archivo y un procesador (ver PROCESSOR_VERSIONS)
+    def key(self, input_path: str, proc) -> str:
+        from web_pipeline.processor import PROCESSOR_VERSIONS
+        name = proc.__name__
+        return f"{name}-v{PROCESSOR_VERSIONS.get(name, 0)}-{file_digest(input_path)}"
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.parquet")
+
+    # Devuelve la ruta del Parquet si hay hit (y lo marca como recién usado)
+    def lookup(self, key: str):
+        if not self.enabled:
+            return None
+        p = self._path(key)
+        if not os.path.isfile(p) or time.time() - os.path.getmtime(p) > self.max_age:
+            return None
+        os.utime(p)
+        return p
+
+    def get(self, key: str):
+        p = self.lookup(key)
+        if p is None:
+            return None
+        import pyarrow.parquet as pq
+        return pq.read_table(p).to_pandas()
+
+    # Lee un hit por lotes de filas (modo streaming)
+    def iter_chunks(self, key: str, chunksize: int):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(self.lookup(key)).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+
+    def put(self, key: str, df: pd.DataFrame):
+        if not self.enabled:
+            return
+        with self.writer(key) as w:
+            w.write(df)
+
+    # Escritor incremental: el Parquet se arma chunk a chunk y se publica al cerrar
+    def writer(self, key: str):
+        return _CacheWriter(self, key)
+
+    # Borra entradas vencidas y, si se pasa del tamaño máximo, las menos usadas
+    def evict(self):
+        if not self.enabled:
+            return
+        now = time.time()
+        entries = []
+        for e in os.scandir(self.cache_dir):
+            if not e.is_file() or not e.name.endswith(".parquet"):
+                continue
+            st = e.stat()
+            if now - st.st_mtime > self.max_age:
+                os.remove(e.path)
+            else:
+                entries.append((st.st_mtime, st.st_size, e.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+
+class _CacheWriter:
+    def __init__(self, cache: ProcessingCache, key: str):
+        self.cache, self.final = cache, cache._path(key)
+        self.tmp = f"{self.final}.{os.getpid()}.tmp"
+        self._w = None
+
+    def write(self, df: pd.DataFrame):
+        if not self.cache.enabled:
+            return
+        import pyarrow as pa, pyarrow.parquet as pq
+        if self._w is None:
+            self._w = pq.ParquetWriter(self.tmp, _schema())
+        self._w.write_table(pa.Table.from_pandas(df, schema=_schema(), preserve_index=False))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if not self.cache.enabled:
+            return
+        if self._w is None:
+            self.write(pd.DataFrame(columns=_schema().names))
+        self._w.close()
+        if exc_type is None:
+            os.replace(self.tmp, self.final)
+            self.cache.evict()
+        elif os.path.exists(self.tmp):
+            os.remove(self.tmp)
@@ -0,0 +1,159 @@
+import os, threading, importlib.util
+import numpy as np
+import pandas as pd
+from web_pipeline.processor import REQUIRED_HEADERS, process_autofix, output_slug
+from web_pipeline.writers import OutputWriter
+from web_pipeline.cache import _schema
+
+# Salida delta: en lugar de la lista completa se emiten solo los artículos que
+# cambiaron respecto de la corrida anterior (ALTA, BAJA o PRECIO). Por proveedor
+# se guarda el último snapshot normalizado en <state_dir>/<slug>.parquet.
+# El snapshot nuevo queda pendiente hasta que el delta se entrega (commit_snapshot):
+# si la validación frena la subida o la subida falla se descarta y la próxima
+# corrida vuelve a comparar contra el anterior, así no se pierden cambios.
+# Con report (ValidationReport) se validan las filas que se escriben en el delta, que
+# es el archivo que se sube; los números de fila de la muestra son los del delta.
+
+STATE_DIR = "./data/state"
+DELTA_COLUMNS = REQUIRED_HEADERS + ["PRECIO_ANTERIOR", "CAMBIO"]
+
+# Claves que identifican un artículo según el procesador
+def delta_keys(proc) -> list:
+    return ["CODIGO", "MARCA"] if proc is process_autofix else ["CODIGO"]
+
+def _key_hash(df: pd.DataFrame, keys: list) -> np.ndarray:
+    return pd.util.hash_pandas_object(df[keys].astype(str), index=False).to_numpy()
+
+# Hash de clave + precio: un código repetido con varios precios no cuenta como cambio
+def _pair_hash(df: pd.DataFrame, keys: list) -> np.ndarray:
+    k = df[keys].astype(str).assign(PRECIO=df["PRECIO"].astype("float64"))
+    return pd.util.hash_pandas_object(k, index=False).to_numpy()
+
+# Compara la lista actual (por chunks o entera) contra el snapshot anterior con un
+# hash join vectorizado: hash de las claves -> Index.get_indexer sobre el índice previo.
+# Solo se mantienen en memoria los hashes (clave y clave+precio) y el precio del snapshot anterior.
+class DeltaTracker:
+    def __init__(self, provider_name: str, outdir: str, keys: list, state_dir: str = STATE_DIR, formats=("xlsx",),
+                 report=None):
+        self.keys = keys
+        self.report = report
+        self.snapshot = os.path.join(state_dir, f"{output_slug(provider_name)}.parquet")
+        self.tmp = f"{self.snapshot}.{os.getpid()}.tmp"
+        self.counts = {"ALTA": 0, "BAJA": 0, "PRECIO": 0}
+        self.enabled = importlib.util.find_spec("pyarrow") is not None
+        if not self.enabled:
+            print("[DELTA] pyarrow no está instalado: modo delta deshabilitado")
+            return
+        os.makedirs(state_dir, exist_ok=True)
+        empty = pd.Index(np.array([], dtype="uint64"))
+        self._prev_index, self._prev_pairs, self._prev_price = empty, empty, np.array([])
+        if os.path.isfile(self.snapshot):
+            prev = pd.read_parquet(self.snapshot, columns=keys + ["PRECIO"])
+            h = _key_hash(prev, keys)
+            last = ~pd.Series(h).duplicated(keep="last").to_numpy()
+            self._prev_index, self._prev_price = pd.Index(h[last]), prev["PRECIO"].to_numpy()[last]
+            self._prev_pairs = pd.Index(_pair_hash(prev, keys)).unique()
+        self._seen = np.zeros(len(self._prev_index), dtype=bool)
+        self._snap = None
+        self._writer = OutputWriter(outdir, f"{provider_name}_delta", formats, DELTA_COLUMNS)
+        self.out = self._writer.path
+
+    # Compara un chunk de la lista actual y lo agrega al nuevo snapshot
+    def write(self, df: pd.DataFrame):
+        if not self.enabled:
+            return
+        import pyarrow as pa, pyarrow.parquet as pq
+        if self._snap is None:
+            self._snap = pq.ParquetWriter(self.tmp, _schema())
+        self._snap.write_table(pa.Table.from_pandas(df[REQUIRED_HEADERS], schema=_schema(), preserve_index=False))
+        if self.report is not None:
+            self.report.source_rows = (self.report.source_rows or 0) + len(df)
+
+        idx = self._prev_index.get_indexer(_key_hash(df, self.keys))
+        found = idx >= 0
+        self._seen[idx[found]] = True
+        prev_price = np.full(len(df), np.nan)
+        prev_price[found] = self._prev_price[idx[found]]
+        changed = found & (self._prev_pairs.get_indexer(_pair_hash(df, self.keys)) < 0)
+        sel = ~found | changed
+        self._emit(df[sel].assign(PRECIO_ANTERIOR=prev_price[sel], CAMBIO=np.where(found[sel], "PRECIO", "ALTA")))
+
+    def _emit(self, out: pd.DataFrame):
+        for k, n in out["CAMBIO"].value_counts().items():
+            self.counts[k] += int(n)
+        self._writer.write(out[DELTA_COLUMNS])
+        if self.report is not None:
+            from web_pipeline.validation import validate_frame
+            validate_frame(out[DELTA_COLUMNS], self.report)
+
+    # Emite las BAJAS (claves del snapshot anterior que no aparecieron) y deja el nuevo
+    # snapshot pendiente de commit_snapshot(ruta del delta)
+    def close(self) -> str:
+        if not self.enabled:
+            return None
+        if self._snap is None:
+            self.write(pd.DataFrame(columns=REQUIRED_HEADERS))
+        gone = ~self._seen
+        if gone.any():
+            import pyarrow.parquet as pq
+            for batch in pq.ParquetFile(self.snapshot).iter_batches(batch_size=50_000):
+                prev = batch.to_pandas()
+                hit = self._prev_index.get_indexer(_key_hash(prev, self.keys))
+                rows = np.flatnonzero((hit >= 0) & gone[np.maximum(hit, 0)])
+                rows = rows[~pd.Series(hit[rows]).duplicated().to_numpy()]  # una BAJA por clave
+                gone[hit[rows]] = False
+                rem = prev.iloc[rows]
+                self._emit(rem.assign(PRECIO=np.nan, PRECIO_ANTERIOR=rem["PRECIO"], CAMBIO="BAJA"))
+        self._writer.close()
+        self._snap.close()
+        with _PENDING_LOCK:
+            _PENDING[self.out] = (self.tmp, self.snapshot, sum(self.counts.values()))
+        c = self.counts
+        print(f"[DELTA] {os.path.basename(self.out)} altas={c['ALTA']:,} bajas={c['BAJA']:,} precios={c['PRECIO']:,}")
+        return self.out
+
+    def abort(self):
+        if not self.enabled:
+            return
+        if self._snap is not None:
+            self._snap.close()
+        if os.path.exists(self.tmp):
+            os.remove(self.tmp)
+        self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is not None:
+            self.abort()
+
+# Snapshots nuevos pendientes: ruta del delta -> (temporal, snapshot, filas del delta)
+_PENDING = {}
+_PENDING_LOCK = threading.Lock()
+
+# Filas del delta pendiente (None si la ruta no es un delta pendiente)
+def pending_rows(path: str):
+    with _PENDING_LOCK:
+        entry = _PENDING.get(path)
+    return entry[2] if entry else None
+
+# El delta se entregó: el snapshot nuevo reemplaza al anterior
+def commit_snapshot(path: str) -> bool:
+    with _PENDING_LOCK:
+        entry = _PENDING.pop(path, None)
+    if entry is None:
+        return False
+    os.replace(entry[0], entry[1])
+    return True
+
+# El delta no se entregó: se descarta el snapshot nuevo y queda el anterior
+def discard_snapshot(path: str):
+    with _PENDING_LOCK:
+        entry = _PENDING.pop(path, None)
+    if entry is not None and os.path.exists(entry[0]):
+        os.remove(entry[0])
+
+def discard_pending():
+    for path in list(_PENDING):
+        discard_snapshot(path)
@@ -0,0 +1,140 @@
+import os, re, hashlib, tempfile
+from urllib.parse import urlparse, unquote
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from web_pipeline import metrics
+
+# Descarga directa por HTTP: el navegador se usa una sola vez para descubrir
+# los endpoints (href/formaction del botón o action + checkboxes del formulario
+# del proveedor) y obtener las cookies de sesión; después los archivos se bajan
+# en paralelo con una requests.Session compartida, calculando el sha256 al vuelo.
+
+HTTP_WORKERS = 4
+HTTP_TIMEOUT = 60
+_CONTENT_EXT = {
+    "spreadsheetml": ".xlsx", "ms-excel": ".xls", "csv": ".csv", "text/plain": ".csv",
+}
+
+# Campos de un formulario: todos los checkboxes de marcas marcados (igual que el camino con clicks)
+_JS_FORM_FIELDS = """
+const fields = f => Array.from(f.elements).filter(e => e.name && !e.disabled).flatMap(e => {
+    if (e.type === 'checkbox') return [[e.name, e.value || 'on']];
+    if (e.type === 'radio') return e.checked ? [[e.name, e.value]] : [];
+    if (e.type === 'submit' || e.type === 'button' || e.type === 'file') return [];
+    return [[e.name, e.value]];
+});
+"""
+
+# Endpoint del botón de una tarjeta (o de su <a>/<form>); None si descarga por JS
+_JS_ENDPOINT = _JS_FORM_FIELDS + """
+const b = arguments[0];
+const abs = u => u ? new URL(u, location.href).href : null;
+const a = b.closest('a[href]');
+const href = b.getAttribute('formaction') || (a && a.getAttribute('href')) || b.getAttribute('href')
+          || b.dataset.href || b.dataset.url || b.dataset.file || b.dataset.download;
+if (href && !href.startsWith('javascript:') && !href.startsWith('#') && !href.startsWith('blob:'))
+    return {method: 'GET', url: abs(href), data: null};
+const f = b.form || b.closest('form');
+if (!f || !f.getAttribute('action')) return null;
+return {method: (f.method || 'GET').toUpperCase(), url: abs(f.getAttribute('action')), data: fields(f)};
+"""
+
+def resolve_button_endpoint(d, css_sel):
+    from selenium.webdriver.common.by import By
+    els = d.find_elements(By.CSS_SELECTOR, css_sel)
+    if not els:
+        return None
+    try:
+        return d.execute_script(_JS_ENDPOINT, els[0])
+    except Exception:
+        return None
+
+# Endpoint de la página del proveedor (formulario con checkboxes o botón de descarga)
+def resolve_page_endpoint(d):
+    from selenium.webdriver.common.by import By
+    for sel in ("#price-list-form button[type='submit']", "#price-list-form button",
+                "form button[type='submit']", "button.download-button"):
+        els = d.find_elements(By.CSS_SELECTOR, sel)
+        if els:
+            try:
+                ep = d.execute_script(_JS_ENDPOINT, els[0])
+            except Exception:
+                ep = None
+            if ep:
+                return ep
+    return None
+
+# Session con pool de conexiones, reintentos y las cookies/UA del navegador
+def make_session(d=None, workers: int = HTTP_WORKERS) -> requests.Session:
+    s = requests.Session()
+    retry = Retry(total=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504),
+                  allowed_methods=frozenset({"GET", "POST"}))
+    adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers, max_retries=retry)
+    s.mount("http://", adapter); s.mount("https://", adapter)
+    if d is not None:
+        for ck in d.get_cookies():
+            s.cookies.set(ck["name"], ck["value"], domain=ck.get("domain"), path=ck.get("path", "/"))
+        try:
+            s.headers["User-Agent"] = d.execute_script("return navigator.userAgent")
+            s.headers["Referer"] = d.current_url
+        except Exception:
+            pass
+    return s
+
+def _slug(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_")
+
+# Nombre del archivo con el slug del proveedor adelante: dos proveedores que sirven el
+# mismo filename (p.ej. lista_precios.csv) no se pisan (Chrome los renombraba solo)
+def _filename(r: requests.Response, name: str) -> str:
+    slug = _slug(name)
+    cd = r.headers.get("Content-Disposition", "")
+    m = re.search(r"filename\*\s*=\s*[^']*''([^;]+)", cd) or re.search(r'filename\s*=\s*"?([^";]+)"?', cd)
+    base = os.path.basename(unquote(m.group(1).strip())) if m else os.path.basename(unquote(urlparse(r.url).path))
+    if m or os.path.splitext(base)[1].lower() in (".xlsx", ".xls", ".csv"):
+        return base if base.lower().startswith(slug + "_") else f"{slug}_{base}"
+    ctype = r.headers.get("Content-Type", "").lower()
+    ext = next((e for k, e in _CONTENT_EXT.items() if k in ctype), ".xlsx")
+    return slug + ext
+
+# Baja un endpoint a download_dir; devuelve (path, sha256). Falla si la respuesta
+# es HTML (p.ej. la sesión venció y volvió la pantalla de login). Escribe en un .part
+# único que se borra si algo falla.
+def fetch(session: requests.Session, ep: dict, download_dir: str, name: str, chunk: int = 1 << 20):
+    method = (ep.get("method") or "GET").upper()
+    data = ep.get("data") or None
+    kw = {"params": data} if method == "GET" else {"data": data}
+    with metrics.stage("download", provider=name, mode="http") as m, \
+         session.request(method, ep["url"], stream=True, timeout=HTTP_TIMEOUT, **kw) as r:
+        r.raise_for_status()
+        if "text/html" in r.headers.get("Content-Type", "").lower():
+            raise ValueError(f"respuesta HTML en lugar de archivo ({r.url})")
+        path = os.path.join(download_dir, _filename(r, name))
+        fd, tmp = tempfile.mkstemp(dir=download_dir, suffix=".part")
+        try:
+            h = hashlib.sha256()
+            with os.fdopen(fd, "wb") as f:
+                for b in r.iter_content(chunk):
+                    h.update(b); f.write(b)
+                m["file"], m["bytes_written"] = os.path.basename(path), f.tell()
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+    return path, h.hexdigest()
+
+# Baja en paralelo {nombre: endpoint}; devuelve (nombre, path, sha256 o None, error) a medida que terminan
+def fetch_all(session, endpoints: dict, download_dir: str, workers: int = HTTP_WORKERS):
+    os.makedirs(download_dir, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="http") as ex:
+        futures = {ex.submit(fetch, session, ep, download_dir, name): name for name, ep in endpoints.items()}
+        for f in as_completed(futures):
+            name = futures[f]
+            try:
+                path, sha = f.result()
+                yield name, path, sha, None
+            except Exception as e:
+                yield name, None, None, e
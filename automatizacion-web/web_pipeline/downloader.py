@@ -1,5 +1,6 @@
-import os, time, json, re
-from typing import List, Tuple, Optional
+import os, time, json, re, queue, threading, atexit
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, Tuple
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
@@ -7,12 +8,37 @@ from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from web_pipeline.watcher import wait_for_file
+from web_pipeline.direct import resolve_button_endpoint, resolve_page_endpoint, make_session, fetch_all, HTTP_WORKERS
+from web_pipeline.cache import remember_digest
+from web_pipeline import metrics
+
+DRIVER_CACHE = "./data/driver/chromedriver.json"
+COOKIE_JAR = "./data/state/cookies.json"
+
+# Ruta de chromedriver: la fijada por el usuario, la que quedó guardada en
+# DRIVER_CACHE o, si no hay ninguna, la que instala webdriver-manager (y se guarda).
+# Así no se consulta la red en cada corrida y funciona en máquinas sin conexión.
+def chromedriver_path(pinned:str=None, cache_file:str=DRIVER_CACHE) -> str:
+    if pinned: return pinned
+    try:
+        with open(cache_file,"r",encoding="utf-8") as f: cached=json.load(f).get("path")
+    except (OSError, ValueError): cached=None
+    if cached and os.path.isfile(cached): return cached
+    path=ChromeDriverManager().install()
+    os.makedirs(os.path.dirname(cache_file) or ".",exist_ok=True)
+    with open(cache_file,"w",encoding="utf-8") as f:
+        json.dump({"path":path,"installed":time.strftime("%Y-%m-%d %H:%M:%S")},f)
+    return path
 
 # Descarga de archivos XLSX/CSV desde web con Selenium
-def make_driver(download_dir:str, headless:bool=True):
+# profile_dir: user-data-dir persistente (la sesión de login sobrevive entre corridas)
+def make_driver(download_dir:str, headless:bool=True, driver_path:str=None, profile_dir:str=None):
     os.makedirs(download_dir,exist_ok=True)
     o=Options()
     if headless: o.add_argument("--headless=new")
+    if profile_dir:
+        os.makedirs(profile_dir,exist_ok=True); o.add_argument(f"--user-data-dir={os.path.abspath(profile_dir)}")
     o.add_argument("--no-sandbox"); o.add_argument("--disable-dev-shm-usage"); o.add_argument("--disable-gpu")
     o.add_argument("--log-level=3"); o.add_argument("--disable-extensions")
     o.add_experimental_option("excludeSwitches", ["enable-logging","enable-automation"])
@@ -23,45 +49,88 @@ def make_driver(download_dir:str, headless:bool=True):
         "download.directory_upgrade": True,
         "safebrowsing.enabled": True
     })
-    try:
-        svc=Service(ChromeDriverManager().install(), log_output=os.devnull)
-    except TypeError:
-        svc=Service(ChromeDriverManager().install())
-    d=webdriver.Chrome(service=svc, options=o)
-    d.set_window_size(1400,900)
+    with metrics.stage("driver_start", headless=headless, profile=bool(profile_dir)):
+        exe=chromedriver_path(driver_path)
+        try:
+            svc=Service(exe, log_output=os.devnull)
+        except TypeError:
+            svc=Service(exe)
+        d=webdriver.Chrome(service=svc, options=o)
+        d.set_window_size(1400,900)
     return d
 
+# Drivers de larga vida (keep=True): se reutilizan entre llamadas a download_all
+# del mismo proceso, uno por carpeta de descarga, y se cierran al salir
+_LIVE_DRIVERS={}
+_LIVE_LOCK=threading.Lock()
+
+def acquire_driver(download_dir:str, headless:bool=True, driver_path:str=None, profile_dir:str=None, keep:bool=False):
+    if not keep:
+        return make_driver(download_dir,headless=headless,driver_path=driver_path,profile_dir=profile_dir)
+    key=(os.path.abspath(download_dir), headless, profile_dir)
+    with _LIVE_LOCK:
+        d=_LIVE_DRIVERS.get(key)
+        if d is not None:
+            try:
+                d.window_handles; return d
+            except Exception:
+                pass
+        d=make_driver(download_dir,headless=headless,driver_path=driver_path,profile_dir=profile_dir)
+        _LIVE_DRIVERS[key]=d
+        return d
+
+def release_driver(d, keep:bool=False):
+    if d is None or keep: return
+    try: d.quit()
+    except: pass
+
+@atexit.register
+def close_drivers():
+    with _LIVE_LOCK:
+        for d in _LIVE_DRIVERS.values():
+            try: d.quit()
+            except: pass
+        _LIVE_DRIVERS.clear()
+
+# Cookie jar en disco: se cargan al arrancar y se guardan al terminar
+def load_cookies(d, jar:str):
+    try:
+        with open(jar,"r",encoding="utf-8") as f: apply_cookies(d, json.load(f))
+    except (OSError, ValueError):
+        pass
+
+def save_cookies(d, jar:str):
+    try:
+        cookies=d.get_cookies()
+    except Exception:
+        return
+    if cookies: write_cookies(jar, cookies)
+
+def write_cookies(jar:str, cookies:list):
+    os.makedirs(os.path.dirname(jar) or ".",exist_ok=True)
+    with open(jar,"w",encoding="utf-8") as f: json.dump(cookies,f)
+
 def _snapshot(dirpath):
     return {f for f in os.listdir(dirpath) if os.path.isfile(os.path.join(dirpath, f))}
 
 # Espera archivo nuevo en dirpath modificado después de 'before' (timestamp)
 def wait_for_new_file(dirpath,before,exts=None,timeout=35):
     exts=[e.lower() for e in (exts or [])] if exts else []
-    end=time.time()+timeout
-    while time.time()<end:
-        c=[]
-        for f in os.listdir(dirpath):
-            p=os.path.join(dirpath,f)
-            if os.path.isfile(p) and os.path.getmtime(p)>before and (not exts or any(f.lower().endswith(x) for x in exts)):
-                if not f.endswith(".crdownload"): c.append(p)
-        if c:
-            c.sort(key=lambda p: os.path.getmtime(p), reverse=True)
-            return c[0]
-        time.sleep(0.2)
-    return None
+    def accept(p):
+        return os.path.getmtime(p)>before and (not exts or any(p.lower().endswith(x) for x in exts))
+    return _timed_wait(dirpath, accept, timeout)
 
 # Espera archivo nuevo en dirpath que no esté en before_names
 def wait_for_new_file_by_name(dirpath, before_names, timeout=25):
-    end = time.time() + timeout
-    while time.time() < end:
-        after = _snapshot(dirpath)
-        new_names = [f for f in after if f not in before_names and not f.endswith(".crdownload")]
-        if new_names:
-            paths = [os.path.join(dirpath, f) for f in new_names]
-            paths.sort(key=lambda p: os.path.getmtime(p), reverse=True)
-            return paths[0]
-        time.sleep(0.2)
-    return None
+    return _timed_wait(dirpath, lambda p: os.path.basename(p) not in before_names, timeout)
+
+# Cada espera de descarga es una etapa (found=False si venció el timeout)
+def _timed_wait(dirpath, accept, timeout):
+    with metrics.stage("download_wait", timeout=timeout) as m:
+        path=wait_for_file(dirpath, accept, timeout)
+        m["found"]=bool(path)
+        if path: m["file"], m["bytes_written"]=os.path.basename(path), metrics.file_size(path)
+    return path
 
 # Detecta si hay formulario de login en la página actual
 def is_login_present(d):
@@ -73,6 +142,10 @@ def is_login_present(d):
 
 # Intenta login con usuario y contraseña
 def try_login(d,u,p):
+    with metrics.stage("login"):
+        _try_login(d,u,p)
+
+def _try_login(d,u,p):
     def _find(css_list):
         for sel in css_list:
             els=d.find_elements(By.CSS_SELECTOR,sel)
@@ -147,45 +220,184 @@ def try_provider_page_download(d,download_dir,exts):
     except: pass
     return None
 
-# Descarga todos los archivos según credenciales y devuelve lista (nombre, path)
-def download_all(credentials_path:str, download_dir:str, headless:bool=True) -> List[Tuple[str,str]]:
+# Login compartido entre drivers: el primero que encuentra la pantalla de login
+# hace try_login y guarda las cookies; el resto las copia en lugar de loguearse.
+class SharedLogin:
+    def __init__(self):
+        self._lock=threading.Lock()
+        self.cookies=None
+
+    def login(self, d, u, p):
+        with self._lock:
+            if self.cookies is None:
+                try_login(d,u,p)
+                if not is_login_present(d): self.cookies=d.get_cookies()
+                return
+        apply_cookies(d, self.cookies); d.refresh()
+
+# Copia cookies a un driver (tiene que estar en una página del mismo dominio)
+def apply_cookies(d, cookies):
+    for ck in cookies or []:
+        ck={k:v for k,v in ck.items() if k in ("name","value","path","domain","secure","httpOnly","expiry")}
+        try: d.add_cookie(ck)
+        except: pass
+
+# Descarga el archivo de una tarjeta (descarga directa, login o página del proveedor)
+def download_card(d, base, name, css_sel, download_dir, u, p, login=None):
+    with metrics.context(provider=name):
+        return _download_card(d, base, name, css_sel, download_dir, u, p, login)
+
+def _download_card(d, base, name, css_sel, download_dir, u, p, login=None):
+    print(f"[{name}] -> Downloading soon...")
+    d.get(base); time.sleep(0.7)
+    t0=time.time()
+    before_names = _snapshot(download_dir)
+    try:
+        click_landing_button(d, css_sel)
+    except:
+        d.get(base); time.sleep(0.7); click_landing_button(d, css_sel)
+    path=wait_for_new_file(download_dir,t0,[".xlsx",".xls",".csv"],35)
+    if not path and is_login_present(d) and u and p:
+        if login: login.login(d,u,p)
+        else: try_login(d,u,p)
+        time.sleep(0.8)
+        path=wait_for_new_file(download_dir,time.time(),[".xlsx",".xls",".csv"],20)
+        if not path: path=try_provider_page_download(d,download_dir,[".xlsx",".xls"])
+    if not path: path=try_provider_page_download(d,download_dir,[".xlsx",".xls"])
+    if not path:
+        path = wait_for_new_file_by_name(download_dir, before_names, timeout=25)
+    if not path:
+        print(f"[ERROR] No se pudo descargar el archivo ({name})."); return None
+    print(f"[DESCARGA] {path}")
+    return path
+
+def _card_name(name):
+    return re.sub(r'(?i)^#?download[-_]?button[-_]?', '', str(name).strip())
+
+# Modo directo, fase de descubrimiento: resuelve el endpoint de la tarjeta sin
+# descargar; si el botón descarga por JS se hace click (y login si hace falta) y
+# se busca el formulario del proveedor. Devuelve ("endpoint", ep), ("file", path) o (None, None)
+def discover_card(d, base, name, css_sel, download_dir, u, p):
+    exts=[".xlsx",".xls",".csv"]
+    d.get(base)
+    WebDriverWait(d,15).until(EC.presence_of_element_located((By.CSS_SELECTOR,css_sel)))
+    ep=resolve_button_endpoint(d, css_sel)
+    if ep: return "endpoint", ep
+    t0=time.time()
+    before_names = _snapshot(download_dir)
+    click_landing_button(d, css_sel)
+    path=wait_for_new_file(download_dir,t0,exts,5)
+    if path: return "file", path
+    if is_login_present(d) and u and p:
+        try_login(d,u,p); time.sleep(0.8)
+        path=wait_for_new_file(download_dir,t0,exts,3)
+        if path: return "file", path
+    ep=resolve_page_endpoint(d)
+    if ep: return "endpoint", ep
+    path=try_provider_page_download(d,download_dir,[".xlsx",".xls"]) or wait_for_new_file_by_name(download_dir, before_names, timeout=25)
+    return ("file", path) if path else (None, None)
+
+# Modo directo: descubre endpoints con el navegador y baja todo en paralelo por HTTP
+# con las cookies de la sesión; si una descarga HTTP falla se vuelve al camino con clicks
+def _download_direct(d, cards, base, download_dir, u, p, workers):
+    endpoints, sels = {}, dict(cards)
+    for name, css_sel in cards:
+        with metrics.context(provider=name):
+            kind, val = discover_card(d, base, name, css_sel, download_dir, u, p)
+        if kind == "endpoint":
+            endpoints[name] = val
+        elif kind == "file":
+            print(f"[DESCARGA] {val}")
+            yield name, val
+        else:
+            print(f"[ERROR] No se pudo descargar el archivo ({name}).")
+    print(f"[HTTP] {len(endpoints)} endpoints directos: {', '.join(endpoints) or '-'}")
+    fallback=[]
+    for name, path, sha, err in fetch_all(make_session(d, workers), endpoints, download_dir, workers):
+        if err is not None:
+            print(f"[HTTP] {name}: {err}; se descarga con el navegador")
+            fallback.append(name); continue
+        remember_digest(path, sha)
+        print(f"[DESCARGA] {path} sha256={sha[:12]}")
+        yield name, path
+    for name in fallback:
+        path=download_card(d, base, name, sels[name], download_dir, u, p)
+        if path: yield name, path
+
+# Descarga todos los archivos según credenciales y va devolviendo (nombre, path)
+# a medida que termina cada uno (generador: el proceso puede arrancar enseguida).
+# drivers > 1: pool de Chrome, cada uno con su carpeta <download_dir>/driver_<i>
+# y una parte de los proveedores; el login se hace una vez y se copian las cookies.
+# direct=True: el navegador solo descubre endpoints y cookies; los archivos se bajan por HTTP.
+# Arranque en caliente: chromedriver fijado/cacheado (driver_path), perfil persistente
+# (profile_dir) o cookie_jar para no repetir el login, y keep_driver para reutilizar el Chrome.
+def download_all(credentials_path:str, download_dir:str, headless:bool=True, drivers:int=1,
+                 direct:bool=False, http_workers:int=HTTP_WORKERS, driver_path:str=None,
+                 profile_dir:str=None, cookie_jar:str=COOKIE_JAR, keep_driver:bool=False) -> Iterator[Tuple[str,str]]:
     with open(credentials_path,"r",encoding="utf-8") as f:
         c=json.load(f)
     base=c.get("base_url","https://desafiodataentryait.vercel.app/")
     u=(c.get("username") or "").strip(); p=(c.get("password") or "").strip()
 
-    d=make_driver(download_dir,headless=headless)
-    results=[]
+    dopts=dict(headless=headless, driver_path=driver_path, keep=keep_driver)
+    d=acquire_driver(download_dir, profile_dir=profile_dir, **dopts)
     try:
-        d.get(base); time.sleep(0.7)
+        d.get(base)
+        if cookie_jar: load_cookies(d, cookie_jar)
+        time.sleep(0.7)
         cards=discover_landing_buttons(d)
         if not cards: raise RuntimeError("No se encontraron tarjetas de descarga.")
-        for name, css_sel in cards:
-            name = re.sub(r'(?i)^#?download[-_]?button[-_]?', '', str(name).strip())
-            print(f"[{name}] -> Downloading soon...")
-            d.get(base); time.sleep(0.7)
-            t0=time.time()
-            before_names = _snapshot(download_dir)
-            try:
-                click_landing_button(d, css_sel)
-            except:
-                d.get(base); time.sleep(0.7); click_landing_button(d, css_sel)
-            path=wait_for_new_file(download_dir,t0,[".xlsx",".xls",".csv"],35)
-            if not path and is_login_present(d) and u and p:
-                try_login(d,u,p); time.sleep(0.8)
-                path=wait_for_new_file(download_dir,time.time(),[".xlsx",".xls",".csv"],20)
-                if not path: path=try_provider_page_download(d,download_dir,[".xlsx",".xls"])
-            if not path: path=try_provider_page_download(d,download_dir,[".xlsx",".xls"])
-            if not path:
-                path = wait_for_new_file_by_name(download_dir, before_names, timeout=25)
-            if not path:
-                print("[ERROR] No se pudo descargar el archivo."); continue
-            print(f"[DESCARGA] {path}")
-            results.append((name, path))
+        cards=[(_card_name(name), css_sel) for name, css_sel in cards]
+        if direct:
+            yield from _download_direct(d, cards, base, download_dir, u, p, http_workers)
+        elif drivers > 1 and len(cards) > 1:
+            release_driver(d, keep_driver); d=None
+            login=SharedLogin()
+            yield from _download_pool(cards, base, download_dir, u, p, min(drivers, len(cards)), login, profile_dir, cookie_jar, dopts)
+            if login.cookies and cookie_jar: write_cookies(cookie_jar, login.cookies)
+        else:
+            for name, css_sel in cards:
+                path=download_card(d, base, name, css_sel, download_dir, u, p)
+                if path: yield name, path
+        if d is not None and cookie_jar and not is_login_present(d): save_cookies(d, cookie_jar)
     finally:
-        try: d.quit()
-        except: pass
-    return results
+        release_driver(d, keep_driver)
+
+# Pool de drivers: los proveedores se reparten en round-robin y cada resultado
+# se devuelve apenas termina, sin esperar al resto de los drivers
+def _download_pool(cards, base, download_dir, u, p, n, login, profile_dir=None, cookie_jar=None, dopts=None):
+    dopts=dopts or {}
+    results=queue.Queue()
+    stop=threading.Event()
+
+    def worker(i):
+        wdir=os.path.join(download_dir,f"driver_{i}")
+        d=None
+        try:
+            # cada Chrome necesita su propio perfil (el user-data-dir queda bloqueado)
+            d=acquire_driver(wdir, profile_dir=os.path.join(profile_dir,f"driver_{i}") if profile_dir else None, **dopts)
+            if cookie_jar:
+                d.get(base); load_cookies(d, cookie_jar)
+            for name, css_sel in cards[i::n]:
+                if stop.is_set(): break
+                results.put((name, download_card(d, base, name, css_sel, wdir, u, p, login)))
+        finally:
+            release_driver(d, dopts.get("keep", False))
+
+    ex=ThreadPoolExecutor(max_workers=n, thread_name_prefix="driver")
+    futures=[ex.submit(worker, i) for i in range(n)]
+    try:
+        for _ in cards:
+            while True:
+                try:
+                    name, path = results.get(timeout=1); break
+                except queue.Empty:
+                    for f in futures:
+                        if f.done() and f.exception(): raise f.exception()
+            if path: yield name, path
+    finally:
+        stop.set()
+        ex.shutdown(wait=True)
 
 if __name__=="__main__":
     import argparse, os
@@ -193,8 +405,16 @@ if __name__=="__main__":
     a.add_argument("--credentials",default="credentials.json")
     a.add_argument("--download_dir",default="./data/raw")
     a.add_argument("--headless",type=lambda x:x.lower()=="true",default=True)
+    a.add_argument("--drivers",type=int,default=1)
+    a.add_argument("--direct",type=lambda x:x.lower()=="true",default=False)
+    a.add_argument("--http_workers",type=int,default=HTTP_WORKERS)
+    a.add_argument("--chromedriver",default=None)
+    a.add_argument("--profile_dir",default=None)
+    a.add_argument("--cookie_jar",default=COOKIE_JAR)
     args=a.parse_args()
     os.makedirs(args.download_dir,exist_ok=True)
-    files=download_all(args.credentials,args.download_dir,headless=args.headless)
+    files=download_all(args.credentials,args.download_dir,headless=args.headless,drivers=args.drivers,
+                       direct=args.direct,http_workers=args.http_workers,driver_path=args.chromedriver,
+                       profile_dir=args.profile_dir,cookie_jar=args.cookie_jar)
     for name, path in files:
         print(name, "->", path)
@@ -0,0 +1,161 @@
+import os, sys, json, time, uuid, threading
+from contextlib import contextmanager
+
+# Instrumentación por etapa: arranque del driver, login, cada espera de descarga,
+# smart_read, normalización, guardado y subida. Cada etapa deja un registro con
+# tiempo de pared, filas de entrada/salida, bytes leídos/escritos y memoria (RSS)
+# como una línea JSON; al final de la corrida se puede volcar un resumen en formato
+# texto de Prometheus para el textfile collector de node_exporter.
+
+METRICS_FILE = "./data/metrics/metrics.jsonl"
+PROM_PREFIX = "price_pipeline"
+
+# Pico de RSS del proceso en bytes (None si la plataforma no lo informa)
+def peak_rss() -> int | None:
+    try:
+        import resource
+    except ImportError:
+        return None
+    v = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return v if sys.platform == "darwin" else v * 1024  # Linux informa KB, macOS bytes
+
+def file_size(path) -> int:
+    try:
+        return os.path.getsize(path) if path else 0
+    except OSError:
+        return 0
+
+class Metrics:
+    def __init__(self, jsonl: str = None, prom: str = None, run_id: str = None):
+        self.jsonl, self.prom = jsonl, prom
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        self.records = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        if jsonl:
+            os.makedirs(os.path.dirname(jsonl) or ".", exist_ok=True)
+
+    # Campos comunes (p.ej. provider) para las etapas de este hilo
+    @contextmanager
+    def context(self, **fields):
+        prev = getattr(self._local, "fields", {})
+        self._local.fields = {**prev, **fields}
+        try:
+            yield
+        finally:
+            self._local.fields = prev
+
+    # Mide una etapa; el bloque puede completar el registro (rows_in, rows_out,
+    # bytes_read, bytes_written, ...). Si hay excepción queda ok=False y se relanza.
+    @contextmanager
+    def stage(self, name: str, **fields):
+        rec = {"stage": name, **getattr(self._local, "fields", {}), **fields}
+        peak0, t = peak_rss(), time.perf_counter()
+        try:
+            yield rec
+            rec["ok"] = True
+        except BaseException as e:
+            rec["ok"], rec["error"] = False, f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            self._finish(rec, time.perf_counter() - t, peak0)
+
+    # Registra una etapa ya medida (p.ej. tiempos acumulados por hoja)
+    def record(self, name: str, seconds: float, **fields):
+        self._finish({"stage": name, **getattr(self._local, "fields", {}), **fields, "ok": True}, seconds, None)
+
+    def _finish(self, rec: dict, seconds: float, peak0):
+        peak = peak_rss()
+        rec["seconds"] = round(seconds, 4)
+        if peak is not None:
+            rec["peak_rss_mb"] = round(peak / (1 << 20), 1)
+            if peak0 is not None:
+                # cuánto subió el pico del proceso durante la etapa
+                rec["peak_rss_growth_mb"] = round((peak - peak0) / (1 << 20), 1)
+        rec["thread"] = threading.current_thread().name
+        rec["run_id"], rec["ts"] = self.run_id, time.strftime("%Y-%m-%dT%H:%M:%S")
+        with self._lock:
+            self.records.append(rec)
+            if self.jsonl:
+                with open(self.jsonl, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(rec, ensure_ascii=False, default=str) + "\n")
+
+    # Totales por (etapa, proveedor)
+    def totals(self) -> dict:
+        out = {}
+        with self._lock:
+            for r in self.records:
+                t = out.setdefault((r["stage"], r.get("provider", "")), dict.fromkeys(
+                    ("seconds", "calls", "errors", "rows_in", "rows_out", "bytes_read", "bytes_written"), 0))
+                t["seconds"] += r["seconds"]; t["calls"] += 1; t["errors"] += not r["ok"]
+                for k in ("rows_in", "rows_out", "bytes_read", "bytes_written"):
+                    t[k] += r.get(k) or 0
+        return out
+
+    def report(self):
+        for (stage, provider), t in sorted(self.totals().items()):
+            print(f"[METRICAS] {stage:<14} {provider or '-':<24} {t['seconds']:8.2f}s x{t['calls']}"
+                  f" filas {t['rows_in']:,}->{t['rows_out']:,} bytes {t['bytes_read']:,}->{t['bytes_written']:,}")
+
+    # Formato texto de Prometheus; se escribe a un temporal y se renombra para que
+    # el textfile collector nunca lea un archivo a medias
+    def write_prometheus(self, path: str = None) -> str:
+        path = path or self.prom
+        totals = self.totals()
+        lines = []
+        for key, (metric, help_) in _PROM_METRICS.items():
+            lines += [f"# HELP {PROM_PREFIX}_{metric} {help_} (última corrida)",
+                      f"# TYPE {PROM_PREFIX}_{metric} gauge"]
+            for (stage, provider), t in sorted(totals.items()):
+                lines.append(f'{PROM_PREFIX}_{metric}{{stage="{_label(stage)}",provider="{_label(provider)}"}} {t[key]:g}')
+        peak = peak_rss()
+        if peak is not None:
+            lines += [f"# HELP {PROM_PREFIX}_peak_rss_bytes pico de memoria del proceso",
+                      f"# TYPE {PROM_PREFIX}_peak_rss_bytes gauge", f"{PROM_PREFIX}_peak_rss_bytes {peak}"]
+        lines += [f"# HELP {PROM_PREFIX}_last_run_timestamp_seconds fin de la última corrida",
+                  f"# TYPE {PROM_PREFIX}_last_run_timestamp_seconds gauge",
+                  f"{PROM_PREFIX}_last_run_timestamp_seconds {time.time():.0f}"]
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8", newline="\n") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp, path)
+        return path
+
+    def close(self):
+        if self.prom:
+            self.write_prometheus()
+
+_PROM_METRICS = {
+    "seconds": ("stage_seconds", "segundos por etapa"),
+    "calls": ("stage_calls", "veces que corrió la etapa"),
+    "errors": ("stage_errors", "etapas terminadas con error"),
+    "rows_in": ("stage_rows_in", "filas de entrada"),
+    "rows_out": ("stage_rows_out", "filas de salida"),
+    "bytes_read": ("stage_bytes_read", "bytes leídos"),
+    "bytes_written": ("stage_bytes_written", "bytes escritos"),
+}
+
+def _label(v) -> str:
+    return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+# Instancia activa del proceso. Por defecto solo acumula en memoria; configure()
+# la reemplaza por una que además escribe el JSONL y/o el archivo de Prometheus.
+_ACTIVE = Metrics()
+
+def configure(jsonl: str = None, prom: str = None) -> Metrics:
+    global _ACTIVE
+    _ACTIVE = Metrics(jsonl, prom)
+    return _ACTIVE
+
+def active() -> Metrics:
+    return _ACTIVE
+
+def stage(name: str, **fields):
+    return _ACTIVE.stage(name, **fields)
+
+def record(name: str, seconds: float, **fields):
+    _ACTIVE.record(name, seconds, **fields)
+
+def context(**fields):
+    return _ACTIVE.context(**fields)
@@ -0,0 +1,111 @@
+import os, time, queue, threading
+from concurrent.futures import ThreadPoolExecutor
+from web_pipeline import metrics
+
+# Pipeline descarga -> proceso -> subida con colas acotadas. Cada archivo se
+# procesa apenas termina de descargarse y las subidas corren en su propio pool
+# mientras se procesa el siguiente: el tiempo total tiende al de la etapa más lenta.
+
+QUEUE_SIZE = 2
+UPLOAD_WORKERS = 2
+_DONE = object()
+
+# Tiempos por etapa (segundos acumulados y por archivo)
+class StageTimings:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stages = {"descarga": 0.0, "proceso": 0.0, "subida": 0.0}
+        self.items = {}
+        self.t0 = time.perf_counter()
+
+    def add(self, stage: str, name: str, seconds: float):
+        with self._lock:
+            self.stages[stage] += seconds
+            self.items.setdefault(name, {})[stage] = round(seconds, 3)
+
+    def summary(self) -> dict:
+        wall = time.perf_counter() - self.t0
+        return {**{k: round(v, 3) for k, v in self.stages.items()}, "total": round(wall, 3)}
+
+    def report(self):
+        for name, t in self.items.items():
+            print(f"[TIEMPOS] {name}: " + " ".join(f"{k}={v:.2f}s" for k, v in t.items()))
+        s = self.summary()
+        print("[TIEMPOS] etapas: " + " ".join(f"{k}={v:.2f}s" for k, v in s.items()))
+
+# Etapa de descarga en un hilo: consume el generador y llena la cola (bloquea si está llena)
+def _download_stage(items, q: queue.Queue, timings: StageTimings, stop: threading.Event):
+    try:
+        it = iter(items)
+        while not stop.is_set():
+            t = time.perf_counter()
+            try:
+                name, path = next(it)
+            except StopIteration:
+                break
+            timings.add("descarga", name, time.perf_counter() - t)
+            while not stop.is_set():
+                try:
+                    q.put((name, path), timeout=0.5); break
+                except queue.Full:
+                    pass
+    except BaseException as e:
+        q.put(e)
+        return
+    finally:
+        if stop.is_set() and hasattr(items, "close"):
+            items.close()
+    q.put(_DONE)
+
+# Ejecuta el pipeline. items: iterable de (nombre, path) (p.ej. download_all);
+# process(nombre, path) -> path de salida (None si no hay que subirlo, p.ej. no pasó la validación);
+# upload(path) -> (status, json) o None para no subir.
+def run_pipeline(items, process, upload=None, queue_size: int = QUEUE_SIZE, upload_workers: int = UPLOAD_WORKERS) -> StageTimings:
+    timings = StageTimings()
+    q = queue.Queue(maxsize=max(1, queue_size))
+    stop = threading.Event()
+    th = threading.Thread(target=_download_stage, args=(items, q, timings, stop), name="descarga", daemon=True)
+    th.start()
+
+    pool = ThreadPoolExecutor(max_workers=max(1, upload_workers), thread_name_prefix="subida") if upload else None
+    # subidas en vuelo acotadas para no acumular archivos procesados sin límite
+    slots = threading.BoundedSemaphore(max(1, queue_size) + max(1, upload_workers))
+    futures = []
+
+    def _upload(name, out_path):
+        try:
+            t = time.perf_counter()
+            with metrics.context(provider=name):
+                code, resp = upload(out_path)
+            timings.add("subida", name, time.perf_counter() - t)
+            print(f"[UPLOAD] {os.path.basename(out_path)} -> status={code} resp={resp}")
+            return code, resp
+        finally:
+            slots.release()
+
+    try:
+        while True:
+            item = q.get()
+            if item is _DONE:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            name, in_path = item
+            t = time.perf_counter()
+            out_path = process(name, in_path)
+            timings.add("proceso", name, time.perf_counter() - t)
+            if out_path is None:
+                continue
+            print(f"[PROCESADO] -> {out_path}")
+            if pool:
+                slots.acquire()
+                futures.append(pool.submit(_upload, name, out_path))
+        for f in futures:
+            f.result()
+    finally:
+        stop.set()
+        if pool:
+            pool.shutdown(wait=True)
+        th.join(timeout=5)
+    timings.report()
+    return timings
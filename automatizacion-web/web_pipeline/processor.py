@@ -1,9 +1,22 @@
-import os, re
+import os, re, csv, time, codecs, importlib.util
 from datetime import datetime
+from itertools import islice
+import numpy as np
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from openpyxl import load_workbook
+from openpyxl.cell.cell import TYPE_ERROR, TYPE_NUMERIC
+from web_pipeline import metrics
 
 # Config 
 REQUIRED_HEADERS = ["CODIGO", "DESCRIPCIÓN", "MARCA", "PRECIO"]
+STREAM_CHUNKSIZE = 50_000  # filas por chunk en modo streaming
+# Subir la versión de un procesador cuando cambian sus reglas invalida su caché
+PROCESSOR_VERSIONS = {
+    "process_autorepuestos_express": 1,
+    "process_autofix": 1,
+    "process_mundo_repcar": 1,
+}
 
 # Utilidades básicas 
 def _norm(s: str) -> str:
@@ -25,51 +38,196 @@ def normalize_price(v):
     except:
         return None
 
+_PRICE_JUNK = r"[^0-9,.-]"
+_PRICE_VALID = r"-?(?:[0-9]+\.?[0-9]*|\.[0-9]+)"
+
+# Versión vectorizada de normalize_price: mismas reglas y mismos floats, pero
+# evaluadas sobre toda la columna (conteos de ',' y '.' calculados una sola vez).
+def normalize_price_series(s: pd.Series) -> pd.Series:
+    s = pd.Series(s)
+    res = np.full(len(s), np.nan)
+
+    # Columnas numéricas: str(v) -> float(...) devuelve el mismo valor salvo
+    # infinitos y floats que Python imprime en notación científica.
+    if s.dtype.kind in "iu":
+        return s.astype("float64")
+    if s.dtype.kind == "f":
+        v = s.to_numpy(dtype="float64", na_value=np.nan)
+        a = np.abs(v)
+        plain = np.isfinite(v) & ((a == 0) | ((a >= 1e-4) & (a < 1e16)))
+        res[plain] = v[plain]
+        odd = np.isfinite(v) & ~plain
+        if odd.any():
+            res[odd] = [np.nan if x is None else x for x in map(normalize_price, v[odd])]
+        return pd.Series(res, index=s.index)
+
+    present = s.notna().to_numpy()
+    if present.any():
+        txt = s[present].astype(str).str.replace(_PRICE_JUNK, "", regex=True)
+        commas = txt.str.count(",")
+        dots = txt.str.count(r"\.")
+        # 1 coma y 0 o varios puntos -> la coma es decimal; si no, las comas son miles
+        dec_comma = (commas == 1) & (dots != 1)
+        txt = txt.where(~dec_comma, txt.str.replace(".", "", regex=False).str.replace(",", ".", regex=False))
+        txt = txt.where(dec_comma, txt.str.replace(",", "", regex=False))
+
+        ok = txt.str.fullmatch(_PRICE_VALID).fillna(False).to_numpy(dtype=bool)
+        if ok.any():
+            res[np.flatnonzero(present)[ok]] = txt[ok].to_numpy(dtype=object).astype("float64")
+    return pd.Series(res, index=s.index)
+
+HEADER_SCAN_ROWS = 40
+CSV_SAMPLE_BYTES = 64 * 1024
+CSV_DELIMITERS = ";,\t|"
+# Valores que read_csv toma como vacíos por defecto (se replican en pyarrow)
+CSV_NA_VALUES = ["", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND",
+                 "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null"]
+_HEADER_KEYWORDS = re.compile("codigo|código|descr|precio|marca|rubro|importe|cod")
+
+# Devuelve el índice de la fila con más celdas que parecen encabezado (None si no hay filas)
+def _find_header_row(preview: pd.DataFrame):
+    if preview.empty:
+        return None
+    cells = pd.Series(preview.astype(str).to_numpy().ravel())
+    hits = cells.str.lower().str.contains(_HEADER_KEYWORDS, na=False).to_numpy(dtype=bool)
+    return int(hits.reshape(preview.shape).sum(axis=1).argmax())
+
+# Usa los valores de la fila de encabezados como nombres de columna del cuerpo
+def _apply_header(df: pd.DataFrame, header: pd.Series) -> pd.DataFrame:
+    cols = header.astype(str).tolist()
+    width = max(len(cols), df.shape[1])
+    df = df.reindex(columns=range(width))
+    df.columns = cols + ["nan"] * (width - len(cols))
+    return df
 
-# Lectura inteligente de XLSX/CSV sin header y detección de fila de encabezados
+# Detecta encoding y separador una sola vez a partir de los primeros bytes del CSV
+def sniff_csv(path: str) -> dict:
+    with open(path, "rb") as f:
+        sample = f.read(CSV_SAMPLE_BYTES)
+    try:
+        text = codecs.getincrementaldecoder("utf-8-sig")().decode(sample, final=False)
+        encoding = "utf-8-sig"
+    except UnicodeDecodeError:
+        text, encoding = sample.decode("latin-1"), "latin-1"
+    lines = text.splitlines()
+    if len(sample) == CSV_SAMPLE_BYTES:
+        lines = lines[:-1]  # última línea posiblemente cortada
+    lines = [l for l in lines if l.strip()][:HEADER_SCAN_ROWS]
+    # títulos sin separador arriba del encabezado confunden al Sniffer
+    lines = [l for l in lines if any(d in l for d in CSV_DELIMITERS)] or lines
+    sep = ","
+    for chunk in ("\n".join(lines), lines[0] if lines else ""):
+        try:
+            sep = csv.Sniffer().sniff(chunk, delimiters=CSV_DELIMITERS).delimiter
+            break
+        except csv.Error:
+            continue
+    engine = "pyarrow" if importlib.util.find_spec("pyarrow") else "c"
+    return {"sep": sep, "encoding": encoding, "engine": engine}
+
+# Cuerpo del CSV con pyarrow, todo como texto (igual que dtype=str en el motor C)
+def _read_csv_arrow(path: str, sep: str, encoding: str, skiprows: int, width: int) -> pd.DataFrame:
+    import pyarrow as pa
+    from pyarrow import csv as pacsv
+    names = [str(i) for i in range(width)]
+    table = pacsv.read_csv(
+        path,
+        read_options=pacsv.ReadOptions(skip_rows=skiprows, column_names=names, encoding=encoding),
+        parse_options=pacsv.ParseOptions(delimiter=sep),
+        convert_options=pacsv.ConvertOptions(
+            column_types={n: pa.string() for n in names}, null_values=CSV_NA_VALUES, strings_can_be_null=True),
+    )
+    df = table.to_pandas()
+    df.columns = range(width)
+    return df.where(df.notna(), np.nan)
+
+# Preview de las primeras HEADER_SCAN_ROWS líneas con tantas columnas como la línea más
+# ancha: un título sin separadores arriba del encabezado no rompe la lectura
+def csv_preview(path: str, sep: str, encoding: str) -> pd.DataFrame:
+    with open(path, "r", encoding=encoding, newline="") as f:
+        width = max((len(r) for r in csv.reader(islice(f, HEADER_SCAN_ROWS), delimiter=sep)), default=1)
+    return pd.read_csv(path, sep=sep, encoding=encoding, header=None, names=range(width), nrows=HEADER_SCAN_ROWS,
+                       dtype=str, skip_blank_lines=False, index_col=False)
+
+# Preview con el motor C (admite nrows) y cuerpo con el motor elegido, salteando
+# las líneas hasta el encabezado inclusive.
+def _read_csv_with(path: str, sep: str, encoding: str, engine: str) -> pd.DataFrame:
+    preview = csv_preview(path, sep, encoding)
+    best_row = _find_header_row(preview)
+    if best_row is None:
+        return preview
+    if engine == "pyarrow":
+        df = _read_csv_arrow(path, sep, encoding, best_row + 1, preview.shape[1])
+    else:
+        df = pd.read_csv(path, sep=sep, encoding=encoding, header=None, names=range(preview.shape[1]),
+                         skiprows=best_row + 1, engine="c", dtype=str, index_col=False)
+    return _apply_header(df, preview.iloc[best_row])
+
+def _read_csv(path: str) -> pd.DataFrame:
+    fmt = sniff_csv(path)
+    attempts = [(fmt["encoding"], fmt["engine"]), ("latin-1", fmt["engine"]), (fmt["encoding"], "c"), ("latin-1", "c")]
+    last = None
+    for enc, engine in dict.fromkeys(attempts):
+        try:
+            df = _read_csv_with(path, fmt["sep"], enc, engine)
+        except Exception as e:
+            last = e
+            continue
+        print(f"[CSV] {os.path.basename(path)} sep={fmt['sep']!r} encoding={enc} engine={engine}")
+        return df
+    raise last
+
+# Lectura inteligente de XLSX/CSV sin header y detección de fila de encabezados.
+# Primero se lee un preview de HEADER_SCAN_ROWS filas y después el cuerpo
+# completo una sola vez, salteando todo hasta la fila de encabezados.
 def smart_read(path: str, sheet=None) -> pd.DataFrame:
+    with metrics.stage("smart_read", file=os.path.basename(path), bytes_read=metrics.file_size(path)) as m:
+        df = _smart_read(path, sheet)
+        m["rows_out"] = len(df)
+    return df
+
+def _smart_read(path: str, sheet=None) -> pd.DataFrame:
     ext = os.path.splitext(path)[1].lower()
-    if ext in (".xlsx", ".xls"):
-        df = pd.read_excel(path, sheet_name=sheet if sheet is not None else 0, header=None)
-    else:
-        raw = None
-        for enc in ("utf-8-sig", "latin-1"):
-            try:
-                raw = pd.read_csv(path, header=None, sep=None, engine="python", encoding=enc)
-                break
-            except Exception:
-                continue
-        if raw is None:
-            raw = pd.read_csv(path, header=None, sep=None, engine="python")
-        df = raw
-
-    best_row, best_score = None, -1
-    lim = min(40, len(df))
-    for i in range(lim):
-        row = df.iloc[i].astype(str).str.lower()
-        score = sum(any(k in cell for k in ["codigo","código","descr","precio","marca","rubro","importe","cod"]) for cell in row)
-        if score > best_score:
-            best_score, best_row = score, i
+    if ext not in (".xlsx", ".xls"):
+        return _read_csv(path)
 
+    sheet = sheet if sheet is not None else 0
+    read = lambda **kw: pd.read_excel(path, sheet_name=sheet, header=None, dtype=object, **kw)
+    preview = read(nrows=HEADER_SCAN_ROWS)
+    best_row = _find_header_row(preview)
     if best_row is None:
-        df.columns = [str(c) for c in df.iloc[0]]
-        df = df.iloc[1:].reset_index(drop=True)
-    else:
-        cols = df.iloc[best_row].astype(str).tolist()
-        df = df.iloc[best_row+1:].reset_index(drop=True)
-        df.columns = cols
-    return df
+        return preview
+    return _apply_header(read(skiprows=best_row + 1), preview.iloc[best_row])
 
 def slugify(s: str) -> str:
     return re.sub(r"[^a-z0-9]+", "_", str(s).lower()).strip("_")
 
-# Guardado de XLSX con nombre normalizado y fecha
-def save_xlsx(df: pd.DataFrame, outdir: str, slug: str) -> str:
+# Slug del proveedor para nombres de archivo (sin prefijo download-button)
+def output_slug(name: str) -> str:
+    return slugify(re.sub(r"(?i)^#?download[-_]?button[-_]?", "", str(name).strip()))
+
+# Ruta de salida <outdir>/<slug>_<YYYY-MM-DD><ext>
+def output_path(outdir: str, slug: str, ext: str = ".xlsx") -> str:
     os.makedirs(outdir, exist_ok=True)
-    slug = re.sub(r"(?i)^#?download[-_]?button[-_]?", "", str(slug).strip())
-    slug = slugify(slug)
-    out = os.path.join(outdir, f"{slug}_{datetime.now().strftime('%Y-%m-%d')}.xlsx")
-    df.to_excel(out, index=False)
+    return os.path.join(outdir, f"{output_slug(slug)}_{datetime.now().strftime('%Y-%m-%d')}{ext}")
+
+# Guardado de XLSX con nombre normalizado y fecha (xlsxwriter constant_memory si está instalado)
+def save_xlsx(df: pd.DataFrame, outdir: str, slug: str) -> str:
+    return save_output(df, outdir, slug, ("xlsx",))
+
+# Guardado en uno o más formatos (xlsx, csv, parquet); devuelve la ruta del primero
+def save_output(df: pd.DataFrame, outdir: str, slug: str, formats=("xlsx",)) -> str:
+    from web_pipeline.writers import write_output
+    with metrics.stage("save", formats=",".join(formats), rows_in=len(df)) as m:
+        paths = write_output(df, outdir, slug, formats)
+        m["bytes_written"] = sum(metrics.file_size(p) for p in paths)
+    return paths[0]
+
+# Normalización de un frame ya leído, medida como etapa aparte de la lectura
+def _normalize(frame_fn, df: pd.DataFrame, path: str) -> pd.DataFrame:
+    with metrics.stage("normalize", file=os.path.basename(path), rows_in=len(df)) as m:
+        out = frame_fn(df)
+        m["rows_out"] = len(out)
     return out
 
 # Busca columna por nombre, case-insensitive ---
@@ -94,10 +252,8 @@ def _force_required_headers(df: pd.DataFrame) -> pd.DataFrame:
             df[h] = ""
     return df[REQUIRED_HEADERS]
 
-# Procesadores por Autorepuestos Express XLSX 
-def process_autorepuestos_express(path: str) -> pd.DataFrame:
-    df = smart_read(path)
-
+# Normalización de Autorepuestos Express sobre un frame ya leído (archivo entero o chunk)
+def _autorepuestos_express_frame(df: pd.DataFrame) -> pd.DataFrame:
     code  = _get_col(df, "codigo proveedor")
     desc  = _get_col(df, "descripcion")
     rubro = _get_col(df, "rubro")
@@ -113,69 +269,148 @@ def process_autorepuestos_express(path: str) -> pd.DataFrame:
 
     base = df[desc].astype(str).fillna("").str.strip()
     if rubro:
-        base = (base + " - " + df[rubro].astype(str).fillna("").str.strip()).str.strip(" -")
+        base = base.str.cat(df[rubro].astype(str).fillna("").str.strip(), sep=" - ").str.strip(" -")
 
     out["DESCRIPCIÓN"] = base.str.slice(0, 100)
     out["MARCA"] = df[brand].astype(str).str.strip() if brand else ""
-    out["PRECIO"] = df[price].apply(normalize_price)
+    out["PRECIO"] = normalize_price_series(df[price])
     out = out[out["PRECIO"].notna()]
     return _force_required_headers(out)
 
-# Procesadores por AutoFix XLSX con múltiples hojas
-def process_autofix(path: str) -> pd.DataFrame:
-    xl = pd.ExcelFile(path)
-    frames = []
-    for sn in xl.sheet_names:
-        try:
-            df = smart_read(path, sheet=sn)
-
-            # Renombrado por sinónimos
-            rename = {}
-            for c in df.columns:
-                k = _norm(c)
-                if k.startswith("codigo"): rename[c] = "CODIGO"
-                elif k in ("descr"): rename[c] = "DESCR"
-                elif k in ("descr2"): rename[c] = "DESCR2"
-                elif k in ("precio"): rename[c] = "PRECIO"
-                elif k in ("codrub"): rename[c] = "CODRUB"
-            if rename:
-                df = df.rename(columns=rename)
-
-            # Columnas
-            code  = "CODIGO" if "CODIGO" in df.columns else next((c for c in df.columns if _norm(c).startswith("codigo")), None)
-            d1    = "DESCR"  if "DESCR"  in df.columns else next((c for c in df.columns if _norm(c).startswith("descr")), None)
-            price = "PRECIO" if "PRECIO" in df.columns else next((c for c in df.columns if _norm(c).startswith("precio") or _norm(c)=="importe"), None)
-            d2    = "DESCR2" if "DESCR2" in df.columns else next((c for c in df.columns if _norm(c) in ("descr2","descripcion2","descrip2")), None)
-            codrb = "CODRUB" if "CODRUB" in df.columns else next((c for c in df.columns if _norm(c) in ("codrub","codrubro","rubro","rub")), None)
-
-            if not code or not d1 or not price:
-                continue
-
-            desc = df[d1].astype(str).fillna("").str.strip()
-            if d2 and d2 in df.columns:
-                desc = (desc + " " + df[d2].astype(str).fillna("").str.strip()).str.strip()
-            if codrb and codrb in df.columns:
-                desc = (desc + " - " + df[codrb].astype(str).fillna("").str.strip()).str.strip(" -")
-
-            tmp = pd.DataFrame({
-                "CODIGO": df[code].astype(str).fillna("").str.strip(),
-                "DESCRIPCIÓN": desc.str.slice(0, 100),
-                "MARCA": sn,
-                "PRECIO": df[price].apply(normalize_price)
-            })
-            pre = len(tmp)
-            tmp = tmp[(tmp["CODIGO"] != "") & (tmp["DESCRIPCIÓN"] != "") & (tmp["PRECIO"].notna())]
-            if len(tmp):
-                frames.append(tmp)
-        except Exception as e: pass
+# Procesadores por Autorepuestos Express XLSX 
+def process_autorepuestos_express(path: str) -> pd.DataFrame:
+    return _normalize(_autorepuestos_express_frame, smart_read(path), path)
 
-    out = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=REQUIRED_HEADERS)
-    return _force_required_headers(out)
+# Normaliza una hoja de AutoFix (MARCA = nombre de la hoja); None si no sirve
+def _autofix_sheet(df: pd.DataFrame, sn: str):
+    try:
+        # Renombrado por sinónimos
+        rename = {}
+        for c in df.columns:
+            k = _norm(c)
+            if k.startswith("codigo"): rename[c] = "CODIGO"
+            elif k in ("descr"): rename[c] = "DESCR"
+            elif k in ("descr2"): rename[c] = "DESCR2"
+            elif k in ("precio"): rename[c] = "PRECIO"
+            elif k in ("codrub"): rename[c] = "CODRUB"
+        if rename:
+            df = df.rename(columns=rename)
+
+        # Columnas
+        code  = "CODIGO" if "CODIGO" in df.columns else next((c for c in df.columns if _norm(c).startswith("codigo")), None)
+        d1    = "DESCR"  if "DESCR"  in df.columns else next((c for c in df.columns if _norm(c).startswith("descr")), None)
+        price = "PRECIO" if "PRECIO" in df.columns else next((c for c in df.columns if _norm(c).startswith("precio") or _norm(c)=="importe"), None)
+        d2    = "DESCR2" if "DESCR2" in df.columns else next((c for c in df.columns if _norm(c) in ("descr2","descripcion2","descrip2")), None)
+        codrb = "CODRUB" if "CODRUB" in df.columns else next((c for c in df.columns if _norm(c) in ("codrub","codrubro","rubro","rub")), None)
+
+        if not code or not d1 or not price:
+            return None
+
+        desc = df[d1].astype(str).fillna("").str.strip()
+        if d2 and d2 in df.columns:
+            desc = desc.str.cat(df[d2].astype(str).fillna("").str.strip(), sep=" ").str.strip()
+        if codrb and codrb in df.columns:
+            desc = desc.str.cat(df[codrb].astype(str).fillna("").str.strip(), sep=" - ").str.strip(" -")
+
+        tmp = pd.DataFrame({
+            "CODIGO": df[code].astype(str).fillna("").str.strip(),
+            "DESCRIPCIÓN": desc.str.slice(0, 100),
+            "MARCA": sn,
+            "PRECIO": normalize_price_series(df[price])
+        })
+        tmp = tmp[(tmp["CODIGO"] != "") & (tmp["DESCRIPCIÓN"] != "") & (tmp["PRECIO"].notna())]
+        return tmp if len(tmp) else None
+    except Exception:
+        return None
 
-# Procesadores por Mundo Repcar CSV
-def process_mundo_repcar(path: str) -> pd.DataFrame:
-    df = smart_read(path)  # CSV
+# Convierte una celda igual que el lector openpyxl de pandas ("" = vacía)
+def _excel_cell(cell):
+    v = cell.value
+    if v is None:                       return ""
+    if cell.data_type == TYPE_ERROR:    return np.nan
+    if cell.data_type == TYPE_NUMERIC:
+        i = int(v)
+        return i if i == v else float(v)
+    return v
+
+_NA_STRINGS = frozenset(CSV_NA_VALUES)
+
+# Fila de openpyxl -> valores (sin celdas vacías al final, textos "NA"/"N/A"/... como NaN)
+def _excel_row(cells) -> list:
+    row = [_excel_cell(c) for c in cells]
+    while row and row[-1] == "":
+        row.pop()
+    return [np.nan if isinstance(v, str) and v in _NA_STRINGS else v for v in row]
+
+# Lista de filas de distinto largo -> DataFrame object rellenado con NaN
+def _rows_frame(rows: list) -> pd.DataFrame:
+    width = max((len(r) for r in rows), default=0)
+    return pd.DataFrame([r + [np.nan] * (width - len(r)) for r in rows], dtype=object)
+
+# Hoja de un workbook ya abierto -> DataFrame con el mismo resultado que smart_read(path, sheet)
+def _sheet_frame(ws) -> pd.DataFrame:
+    if hasattr(ws, "reset_dimensions"):
+        ws.reset_dimensions()
+    rows, last = [], -1
+    for i, r in enumerate(ws.iter_rows()):
+        rows.append(_excel_row(r))
+        if rows[-1]:
+            last = i
+    df = _rows_frame(rows[:last + 1])
+    best_row = _find_header_row(df.head(HEADER_SCAN_ROWS))
+    if best_row is None:
+        return df
+    return _apply_header(df.iloc[best_row + 1:].reset_index(drop=True), df.iloc[best_row])
+
+# Workbook abierto por cada proceso del pool (ver _init_autofix_worker)
+_WORKER_WB = None
+
+def _init_autofix_worker(path: str):
+    global _WORKER_WB
+    _WORKER_WB = load_workbook(path, read_only=True, data_only=True)
+
+def _autofix_worker_sheet(sn: str):
+    return _autofix_sheet(_sheet_frame(_WORKER_WB[sn]), sn)
+
+# Procesadores por AutoFix XLSX con múltiples hojas. El workbook se abre una
+# sola vez (read-only) y se recorre hoja por hoja; con workers > 1 las hojas se
+# reparten en un pool de procesos y se unen respetando el orden de las hojas.
+# Métricas: en modo secuencial lectura (smart_read) y normalización se acumulan
+# por separado entre hojas; con el pool se registra una sola etapa normalize.
+def process_autofix(path: str, workers: int = 1) -> pd.DataFrame:
+    t0 = time.perf_counter()
+    wb = load_workbook(path, read_only=True, data_only=True)
+    sheets = list(wb.sheetnames)
+    parallel = workers > 1 and len(sheets) > 1
+    read_s, norm_s, rows_in, frames = time.perf_counter() - t0, 0.0, 0, []
+    try:
+        for sn in ([] if parallel else sheets):
+            t = time.perf_counter()
+            raw = _sheet_frame(wb[sn])
+            t1 = time.perf_counter()
+            frames.append(_autofix_sheet(raw, sn))
+            read_s, norm_s, rows_in = read_s + t1 - t, norm_s + time.perf_counter() - t1, rows_in + len(raw)
+    finally:
+        wb.close()
+    if parallel:
+        with ProcessPoolExecutor(min(workers, len(sheets)), initializer=_init_autofix_worker, initargs=(path,)) as ex:
+            frames = list(ex.map(_autofix_worker_sheet, sheets))
+
+    t = time.perf_counter()
+    frames = [f for f in frames if f is not None]
+    out = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=REQUIRED_HEADERS)
+    out = _force_required_headers(out)
+    name = os.path.basename(path)
+    if parallel:
+        metrics.record("normalize", time.perf_counter() - t0, file=name, rows_out=len(out),
+                       bytes_read=metrics.file_size(path), workers=workers, sheets=len(sheets))
+    else:
+        metrics.record("smart_read", read_s, file=name, rows_out=rows_in, bytes_read=metrics.file_size(path), sheets=len(sheets))
+        metrics.record("normalize", norm_s + time.perf_counter() - t, file=name, rows_in=rows_in, rows_out=len(out))
+    return out
 
+# Normalización de Mundo Repcar sobre un frame ya leído (archivo entero o chunk)
+def _mundo_repcar_frame(df: pd.DataFrame) -> pd.DataFrame:
     # código: intenta primero 'codigo articulo', si no, 'cod fabrica'
     code = _get_col(df, "codigo articulo") or _get_col(df, "cod fabrica")
 
@@ -192,14 +427,33 @@ def process_mundo_repcar(path: str) -> pd.DataFrame:
 
     d = df[desc].astype(str).fillna("").str.strip()
     if rubro:
-        d = (d + " - " + df[rubro].astype(str).fillna("").str.strip()).str.strip(" -")
+        d = d.str.cat(df[rubro].astype(str).fillna("").str.strip(), sep=" - ").str.strip(" -")
     out["DESCRIPCIÓN"] = d.str.slice(0, 100)
 
     out["MARCA"] = df[brand].astype(str).str.strip() if brand else ""
-    out["PRECIO"] = df[price].apply(normalize_price)
+    out["PRECIO"] = normalize_price_series(df[price])
     out = out[out["PRECIO"].notna()]
     return _force_required_headers(out)
 
+# Procesadores por Mundo Repcar CSV
+def process_mundo_repcar(path: str) -> pd.DataFrame:
+    return _normalize(_mundo_repcar_frame, smart_read(path), path)
+
+# Esquema compacto: MARCA categórica (pocos valores distintos; en Autofix es el
+# nombre de la hoja repetido) y CODIGO/DESCRIPCIÓN como strings de pyarrow en
+# lugar de objetos Python. PRECIO queda en float64. Los valores no cambian.
+def compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    out = df.copy(deep=False)
+    if importlib.util.find_spec("pyarrow") is not None:
+        for c in ("CODIGO", "DESCRIPCIÓN"):
+            out[c] = df[c].astype("string[pyarrow]")
+    out["MARCA"] = df["MARCA"].astype("category")
+    return out
+
+# Memoria real del frame en MB (incluye los strings)
+def frame_mb(df: pd.DataFrame) -> float:
+    return df.memory_usage(deep=True).sum() / (1 << 20)
+
 # Selección y fachada 
 def processor_for(name: str):
     s = slugify(name)
@@ -209,7 +463,51 @@ def processor_for(name: str):
     return process_autorepuestos_express  # default
 
 # Procesa según proveedor, normaliza headers y guarda XLSX final.
-def process_and_save(provider_name: str, input_path: str, outdir: str) -> str:
+# stream=True lee y escribe por chunks de filas (ver web_pipeline/streaming.py).
+# cache (ProcessingCache) reutiliza el resultado si el archivo no cambió.
+# delta_dir compara contra el snapshot del proveedor y devuelve la ruta del XLSX delta
+# (solo altas, bajas y cambios de precio) en lugar de la lista completa; el snapshot
+# nuevo queda pendiente hasta delta.commit_snapshot / discard_snapshot.
+# report (ValidationReport) valida el resultado en memoria antes de la subida (con delta_dir,
+# las filas del delta, que es lo que se sube).
+# formats: formatos de salida (xlsx, csv, parquet); se devuelve la ruta del primero.
+# compact: esquema compacto en memoria (ver compact_frame), con reporte de memoria.
+# Las etapas (smart_read, normalize, save) quedan en web_pipeline.metrics con el proveedor.
+def process_and_save(provider_name: str, input_path: str, outdir: str, workers: int = 1,
+                     stream: bool = False, chunksize: int = STREAM_CHUNKSIZE, cache=None,
+                     delta_dir: str = None, report=None, formats=("xlsx",), compact: bool = False) -> str:
+    with metrics.context(provider=provider_name):
+        return _process_and_save(provider_name, input_path, outdir, workers, stream, chunksize,
+                                 cache, delta_dir, report, formats, compact)
+
+def _process_and_save(provider_name, input_path, outdir, workers, stream, chunksize, cache,
+                      delta_dir, report, formats, compact) -> str:
     proc = processor_for(provider_name)
-    df   = proc(input_path)
-    return save_xlsx(df, outdir, provider_name)
+    key  = cache.key(input_path, proc) if cache is not None and cache.enabled else None
+    if stream and not input_path.lower().endswith(".xls"):
+        from web_pipeline.streaming import process_and_save_streaming
+        return process_and_save_streaming(provider_name, input_path, outdir, chunksize=chunksize,
+                                          cache=cache, key=key, delta_dir=delta_dir, report=report,
+                                          formats=formats)
+
+    df = cache.get(key) if key else None
+    if df is not None:
+        print(f"[CACHE] {os.path.basename(input_path)} sin cambios, se reutiliza el resultado")
+    else:
+        df = proc(input_path, workers=workers) if proc is process_autofix else proc(input_path)
+        if key:
+            cache.put(key, df)
+    if compact:
+        before = frame_mb(df)
+        df = compact_frame(df)
+        print(f"[MEMORIA] {provider_name}: {before:,.1f} MB -> {frame_mb(df):,.1f} MB ({len(df):,} filas)")
+    out = save_output(df, outdir, provider_name, formats)
+    if delta_dir:
+        from web_pipeline.delta import DeltaTracker, delta_keys
+        with DeltaTracker(provider_name, outdir, delta_keys(proc), delta_dir, formats, report) as d:
+            d.write(df)
+            out = d.close() or out
+    if report is not None and not (delta_dir and d.enabled):
+        from web_pipeline.validation import validate_frame
+        validate_frame(df, report)
+    return out
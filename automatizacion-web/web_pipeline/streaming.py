@@ -0,0 +1,137 @@
+import os
+from itertools import islice
+import pandas as pd
+from openpyxl import load_workbook
+from web_pipeline.processor import (
+    HEADER_SCAN_ROWS, STREAM_CHUNKSIZE,
+    _find_header_row, _apply_header, _excel_row, _rows_frame, sniff_csv, csv_preview,
+    _autorepuestos_express_frame, _mundo_repcar_frame, _autofix_sheet, _force_required_headers,
+    process_autofix, process_mundo_repcar, processor_for,
+)
+from web_pipeline.writers import OutputWriter
+from web_pipeline import metrics
+
+# Modo streaming: el archivo se lee por chunks de filas, cada chunk se normaliza
+# con las mismas reglas del proveedor y se escribe enseguida en el XLSX de salida.
+# La memoria queda acotada por el tamaño del chunk, no por el del archivo.
+
+# Chunks de una hoja XLSX abierta en read-only (misma detección de encabezados que smart_read)
+def iter_sheet_chunks(ws, chunksize: int = STREAM_CHUNKSIZE):
+    if hasattr(ws, "reset_dimensions"):
+        ws.reset_dimensions()
+    rows = ws.iter_rows()
+    preview = _rows_frame([_excel_row(r) for r in islice(rows, HEADER_SCAN_ROWS)])
+    best_row = _find_header_row(preview)
+    if best_row is None:
+        return
+    header = preview.iloc[best_row]
+    batch = [preview.iloc[i].tolist() for i in range(best_row + 1, len(preview))]
+    for r in rows:
+        batch.append(_excel_row(r))
+        if len(batch) >= chunksize:
+            yield _apply_header(_rows_frame(batch), header)
+            batch = []
+    if batch:
+        yield _apply_header(_rows_frame(batch), header)
+
+# Chunks de un CSV: encoding/separador detectados una vez, cuerpo con el motor C por chunks
+def iter_csv_chunks(path: str, chunksize: int = STREAM_CHUNKSIZE, encoding: str = None):
+    fmt = sniff_csv(path)
+    kw = dict(sep=fmt["sep"], encoding=encoding or fmt["encoding"], header=None)
+    preview = csv_preview(path, kw["sep"], kw["encoding"])
+    best_row = _find_header_row(preview)
+    if best_row is None:
+        return
+    print(f"[CSV] {os.path.basename(path)} sep={kw['sep']!r} encoding={kw['encoding']} engine=c chunksize={chunksize}")
+    header = preview.iloc[best_row]
+    with pd.read_csv(path, skiprows=best_row + 1, engine="c", dtype=str, index_col=False,
+                     names=range(preview.shape[1]), chunksize=chunksize, **kw) as reader:
+        for chunk in reader:
+            yield _apply_header(chunk.reset_index(drop=True), header)
+
+# Chunks normalizados (CODIGO, DESCRIPCIÓN, MARCA, PRECIO) según el procesador del proveedor
+def iter_normalized_chunks(proc, path: str, chunksize: int = STREAM_CHUNKSIZE, encoding: str = None):
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".xlsx":
+        wb = load_workbook(path, read_only=True, data_only=True)
+        try:
+            sheets = wb.sheetnames if proc is process_autofix else wb.sheetnames[:1]
+            for sn in sheets:
+                for chunk in iter_sheet_chunks(wb[sn], chunksize):
+                    if proc is process_autofix:
+                        out = _autofix_sheet(chunk, sn)
+                        if out is not None:
+                            yield _force_required_headers(out)
+                    else:
+                        yield _chunk_transform(proc)(chunk)
+        finally:
+            wb.close()
+        return
+    for chunk in iter_csv_chunks(path, chunksize, encoding):
+        yield _chunk_transform(proc)(chunk)
+
+def _chunk_transform(proc):
+    return _mundo_repcar_frame if proc is process_mundo_repcar else _autorepuestos_express_frame
+
+class _NullSink:
+    def write(self, df):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+# Versión streaming de process_and_save: mismo archivo de salida, memoria acotada.
+# Lectura, normalización y escritura van intercaladas: se miden como una etapa "stream".
+# Con caché: si hay hit se copia el Parquet por lotes; si no, los chunks
+# normalizados se guardan también en la caché a medida que se escriben.
+def process_and_save_streaming(provider_name: str, input_path: str, outdir: str,
+                               chunksize: int = STREAM_CHUNKSIZE, cache=None, key=None,
+                               delta_dir: str = None, report=None, formats=("xlsx",)) -> str:
+    with metrics.stage("stream", file=os.path.basename(input_path), bytes_read=metrics.file_size(input_path),
+                       formats=",".join(formats)) as m:
+        out, w = _process_and_save_streaming(provider_name, input_path, outdir, chunksize, cache, key,
+                                             delta_dir, report, formats)
+        m["rows_out"], m["bytes_written"] = w.rows, sum(metrics.file_size(p) for p in w.paths)
+    return out
+
+def _process_and_save_streaming(provider_name, input_path, outdir, chunksize, cache, key, delta_dir, report, formats):
+    proc = processor_for(provider_name)
+    hit = key is not None and cache.lookup(key) is not None
+    if hit:
+        print(f"[CACHE] {os.path.basename(input_path)} sin cambios, se reutiliza el resultado")
+    if report is not None:
+        from web_pipeline.validation import validate_frame
+    for enc in (None, "latin-1"):
+        try:
+            if report is not None:
+                report.reset()
+            sink = cache.writer(key) if key is not None and not hit else _NullSink()
+            delta = _delta_tracker(provider_name, outdir, proc, delta_dir, formats, report) if delta_dir else _NullSink()
+            # con delta se validan las filas del delta (las valida el tracker), no la lista completa
+            check = report if report is not None and not getattr(delta, "enabled", False) else None
+            with OutputWriter(outdir, provider_name, formats) as w, sink, delta:
+                chunks = cache.iter_chunks(key, chunksize) if hit else \
+                    iter_normalized_chunks(proc, input_path, chunksize, encoding=enc)
+                for chunk in chunks:
+                    w.write(chunk)
+                    sink.write(chunk)
+                    delta.write(chunk)
+                    if check is not None:
+                        validate_frame(chunk, check)
+            break
+        except UnicodeDecodeError:
+            # byte inválido más allá de la muestra del CSV: se rehace todo en latin-1
+            if enc is not None:
+                raise
+    out = w.path
+    print(f"[STREAM] {', '.join(os.path.basename(p) for p in w.paths)} ({w.rows:,} filas)")
+    if delta_dir:
+        out = delta.close() or out
+    return out, w
+
+def _delta_tracker(provider_name, outdir, proc, delta_dir, formats, report=None):
+    from web_pipeline.delta import DeltaTracker, delta_keys
+    return DeltaTracker(provider_name, outdir, delta_keys(proc), delta_dir, formats, report)
@@ -1,18 +1,153 @@
-import os, requests, json
+import os, re, time, json, hashlib, zipfile, threading, requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from web_pipeline.cache import file_digest
+from web_pipeline import metrics
+
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+UPLOAD_LEDGER = "./data/state/uploads.json"
+UPLOAD_RETRIES = 3
+UPLOAD_BACKOFF = 1.0
+UPLOAD_TIMEOUT = 60
 
 # Sube archivo a API y devuelve (status_code, response_json)
 def upload_file(api_url, path):
-    with open(path,"rb") as f:
-        r=requests.post(api_url, files={"file":(os.path.basename(path), f, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")}, timeout=60)
+    with metrics.stage("upload", file=os.path.basename(path), bytes_read=metrics.file_size(path)) as m:
+        with open(path,"rb") as f:
+            r=requests.post(api_url, files={"file":(os.path.basename(path), f, XLSX_MIME)}, timeout=60)
+        m["status"]=r.status_code
     try: data=r.json()
     except: data={"text":r.text}
     return r.status_code, data
 
+# Hash del contenido de un XLSX: las partes del zip (nombre + bytes descomprimidos) sin
+# docProps/core.xml ni las fechas del zip, que cambian en cada guardado aunque la lista
+# sea la misma. Otros archivos (o un zip inválido) usan el sha256 del archivo.
+def content_digest(path: str) -> str:
+    if not path.lower().endswith(".xlsx"):
+        return file_digest(path)
+    try:
+        h = hashlib.sha256()
+        with zipfile.ZipFile(path) as z:
+            for name in sorted(z.namelist()):
+                if name == "docProps/core.xml":
+                    continue
+                h.update(name.encode() + b"\0")
+                with z.open(name) as f:
+                    for b in iter(lambda: f.read(1 << 20), b""):
+                        h.update(b)
+        return h.hexdigest()
+    except zipfile.BadZipFile:
+        return file_digest(path)
+
+# Clave del ledger: el nombre de salida sin la fecha (<slug>_<YYYY-MM-DD>.xlsx -> <slug>),
+# así la lista de cada proveedor (y su delta) se compara solo con su propia última subida
+def ledger_key(path: str) -> str:
+    return re.sub(r"_\d{4}-\d{2}-\d{2}$", "", os.path.splitext(os.path.basename(path))[0])
+
+# Registro local de la última subida exitosa: api_url -> ledger_key -> hash del contenido
+# (content_digest) + respuesta. Solo se omite un archivo idéntico al último enviado con esa
+# clave: si en el medio se subió otro contenido (A, B, A), A se vuelve a enviar.
+class UploadLedger:
+    def __init__(self, path: str = UPLOAD_LEDGER):
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self._data = json.load(f)
+        except (OSError, ValueError):
+            self._data = {}
+
+    def get(self, api_url: str, key: str, digest: str):
+        with self._lock:
+            last = self._data.get(api_url, {}).get(key)
+            return last if isinstance(last, dict) and last.get("digest") == digest else None
+
+    def put(self, api_url: str, key: str, digest: str, name: str, resp: dict):
+        with self._lock:
+            self._data.setdefault(api_url, {})[key] = {
+                "digest": digest, "file": name, "link": resp.get("link"), "uploaded": time.strftime("%Y-%m-%d %H:%M:%S"), "response": resp,
+            }
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._data, f, ensure_ascii=False, indent=1)
+            os.replace(tmp, self.path)
+
+# Cliente de subida: Session con keep-alive y pool de conexiones, límite de subidas
+# simultáneas, reintentos con backoff exponencial (5xx, timeouts, errores de conexión)
+# y ledger para no repetir el último archivo subido de cada lista (devuelve su link).
+class Uploader:
+    def __init__(self, api_url: str, max_workers: int = 2, retries: int = UPLOAD_RETRIES,
+                 backoff: float = UPLOAD_BACKOFF, timeout: float = UPLOAD_TIMEOUT, ledger: str = UPLOAD_LEDGER):
+        self.api_url = api_url
+        self.max_workers = max(1, max_workers)
+        self.retries, self.backoff, self.timeout = retries, backoff, timeout
+        self.ledger = UploadLedger(ledger) if ledger else None
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers)
+        self.session.mount("http://", adapter); self.session.mount("https://", adapter)
+        self._slots = threading.BoundedSemaphore(self.max_workers)
+
+    def _post(self, path: str):
+        with open(path, "rb") as f:
+            r = self.session.post(self.api_url, files={"file": (os.path.basename(path), f, XLSX_MIME)}, timeout=self.timeout)
+        try: data = r.json()
+        except ValueError: data = {"text": r.text}
+        return r.status_code, data
+
+    # Sube un archivo y devuelve (status_code, response_json)
+    def upload(self, path: str):
+        with metrics.stage("upload", file=os.path.basename(path), bytes_read=metrics.file_size(path)) as m:
+            code, data = self._upload(path, m)
+            m["status"] = code
+        return code, data
+
+    def _upload(self, path: str, m: dict):
+        name = os.path.basename(path)
+        key, digest = (ledger_key(path), content_digest(path)) if self.ledger else (None, None)
+        prev = self.ledger.get(self.api_url, key, digest) if self.ledger else None
+        if prev:
+            print(f"[UPLOAD] {name} idéntico a {prev['file']} (subido {prev['uploaded']}): se reutiliza el link")
+            m["skipped"] = True
+            return 200, {**prev["response"], "link": prev["link"], "skipped": True}
+        with self._slots:
+            for attempt in range(self.retries + 1):
+                try:
+                    code, data = self._post(path)
+                except (requests.Timeout, requests.ConnectionError) as e:
+                    code, data = None, {"error": str(e)}
+                m["attempts"] = attempt + 1
+                if code is not None and code < 500:
+                    break
+                if attempt < self.retries:
+                    wait = self.backoff * 2 ** attempt
+                    print(f"[UPLOAD] {name} status={code} -> reintento {attempt + 1}/{self.retries} en {wait:.1f}s")
+                    time.sleep(wait)
+        if code is not None and 200 <= code < 300 and self.ledger:
+            self.ledger.put(self.api_url, key, digest, name, data)
+        return code, data
+
+    # Sube varios archivos en paralelo; devuelve (path, status, json) a medida que terminan
+    def upload_many(self, paths):
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="subida") as ex:
+            futures = {ex.submit(self.upload, p): p for p in paths}
+            for f in as_completed(futures):
+                code, data = f.result()
+                yield futures[f], code, data
+
+    def close(self):
+        self.session.close()
+
 if __name__=="__main__":
     import argparse
     a=argparse.ArgumentParser()
-    a.add_argument("--file",required=True)
+    a.add_argument("--file",required=True,nargs="+")
     a.add_argument("--api_url",default="https://desafio.somosait.com/api/upload/")
+    a.add_argument("--upload_workers",type=int,default=2)
+    a.add_argument("--retries",type=int,default=UPLOAD_RETRIES)
+    a.add_argument("--ledger",default=UPLOAD_LEDGER)
     args=a.parse_args()
-    code,resp=upload_file(args.api_url,args.file)
-    print(f"[UPLOAD] {args.file} -> status={code} resp={resp}")
+    up=Uploader(args.api_url,max_workers=args.upload_workers,retries=args.retries,ledger=args.ledger)
+    for path,code,resp in up.upload_many(args.file):
+        print(f"[UPLOAD] {path} -> status={code} resp={resp}")
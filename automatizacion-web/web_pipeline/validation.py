@@ -0,0 +1,127 @@
+import os, json, time
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from web_pipeline.processor import REQUIRED_HEADERS
+
+# Validación previa a la subida sobre el DataFrame en memoria (sin releer el XLSX):
+# encabezados requeridos, salida vacía, DESCRIPCIÓN <= 100 caracteres y PRECIO con
+# formato decimal (numérico, punto decimal, finito y no negativo). Todo vectorizado.
+# Con --delta se valida el XLSX delta que se sube (no la lista completa): las BAJAS van
+# sin PRECIO a propósito y no cuentan como "sin PRECIO", un delta vacío es "sin cambios"
+# y lo que frena la subida es que la lista completa venga vacía (todo serían BAJAS).
+
+DESC_MAX = 100
+SAMPLE_ROWS = 5
+_PRICE_RE = r"\d+(?:\.\d+)?"
+ROW_CHECKS = {
+    "codigo_vacio": "CODIGO vacío",
+    "descripcion_larga": f"DESCRIPCIÓN > {DESC_MAX} caracteres",
+    "precio_formato": "PRECIO con formato no decimal",
+    "precio_invalido": "PRECIO negativo o infinito",
+    "precio_vacio": "sin PRECIO",
+}
+
+# Resultado de validar la salida de un proveedor (acumulable por chunks)
+class ValidationReport:
+    def __init__(self, provider: str):
+        self.provider = provider
+        self.reset()
+
+    def reset(self):
+        self.rows = 0
+        self.source_rows = None  # filas de la lista completa en modo delta (None: sin delta)
+        self.missing = []
+        self.counts = dict.fromkeys(ROW_CHECKS, 0)
+        self.samples = {k: [] for k in ROW_CHECKS}
+        self.seconds = 0.0
+
+    # Errores que la API rechaza seguro: no tiene sentido subir el archivo
+    @property
+    def fatal(self) -> list:
+        errs = []
+        if self.missing:
+            errs.append(f"faltan columnas {', '.join(self.missing)}")
+        if self.source_rows is None and self.rows == 0:
+            errs.append("salida vacía")
+        if self.source_rows == 0:
+            errs.append("lista completa vacía")
+        return errs
+
+    def ok(self, strict: bool = False) -> bool:
+        return not self.fatal and not (strict and any(self.counts.values()))
+
+    def to_dict(self) -> dict:
+        d = {"proveedor": self.provider, "filas": self.rows, "errores": self.fatal,
+                "observaciones": {k: n for k, n in self.counts.items() if n},
+                "filas_xlsx": {k: v for k, v in self.samples.items() if v},
+                "segundos": round(self.seconds, 4)}
+        if self.source_rows is not None:
+            d["filas_lista"] = self.source_rows
+        return d
+
+    def summary(self) -> str:
+        obs = ", ".join(f"{ROW_CHECKS[k]}: {n:,}" for k, n in self.counts.items() if n) or "sin observaciones"
+        head = "ERROR " + "; ".join(self.fatal) if self.fatal else "OK"
+        return f"{self.provider}: {head} | {self.rows:,} filas | {obs} ({self.seconds * 1000:.0f} ms)"
+
+# Valida un DataFrame normalizado (o un chunk, o las filas de un delta) y acumula el resultado en report
+def validate_frame(df: pd.DataFrame, report: ValidationReport) -> ValidationReport:
+    t = time.perf_counter()
+    offset = report.rows
+    report.rows += len(df)
+    missing = [c for c in REQUIRED_HEADERS if c not in df.columns]
+    if missing:
+        report.missing = sorted(set(report.missing) | set(missing), key=REQUIRED_HEADERS.index)
+        report.seconds += time.perf_counter() - t
+        return report
+
+    code = df["CODIGO"].astype(str).str.strip()
+    desc = df["DESCRIPCIÓN"].astype(str)
+    price = df["PRECIO"]
+    if pd.api.types.is_numeric_dtype(price) and not pd.api.types.is_bool_dtype(price):
+        num = price.astype("float64")
+        bad_format = np.zeros(len(df), dtype=bool)
+    else:
+        # PRECIO como texto: solo se acepta "1234.56" (sin miles ni coma decimal)
+        txt = price.astype("string").str.strip()
+        bad_format = (txt.notna() & (txt != "") & ~txt.str.fullmatch(_PRICE_RE).fillna(False)).to_numpy(dtype=bool)
+        num = pd.to_numeric(txt.where(~bad_format), errors="coerce")
+    vals = num.to_numpy(dtype="float64")
+    baja = df["CAMBIO"].eq("BAJA").to_numpy(dtype=bool) if "CAMBIO" in df.columns else np.zeros(len(df), dtype=bool)
+    masks = {
+        "codigo_vacio": code.isin(["", "nan", "None"]).to_numpy(),
+        "descripcion_larga": (desc.str.len() > DESC_MAX).to_numpy(),
+        "precio_formato": bad_format,
+        "precio_invalido": np.isinf(vals) | (vals < 0),
+        "precio_vacio": np.isnan(vals) & ~bad_format & ~baja,
+    }
+    for k, m in masks.items():
+        n = int(m.sum())
+        if n:
+            report.counts[k] += n
+            room = SAMPLE_ROWS - len(report.samples[k])
+            if room > 0:
+                # número de fila en el XLSX de salida (fila 1 = encabezados)
+                report.samples[k] += [int(i) + offset + 2 for i in np.flatnonzero(m)[:room]]
+    report.seconds += time.perf_counter() - t
+    return report
+
+# Reporte del lote: una línea por proveedor en consola y un JSON en outdir
+class ValidationBatch:
+    def __init__(self, strict: bool = False):
+        self.strict = strict
+        self.reports = []
+
+    def new(self, provider: str) -> ValidationReport:
+        r = ValidationReport(provider)
+        self.reports.append(r)
+        return r
+
+    def write(self, outdir: str) -> str:
+        for r in self.reports:
+            print(f"[VALIDACION] {r.summary()}")
+        path = os.path.join(outdir, f"validacion_{datetime.now().strftime('%Y-%m-%d')}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"estricto": self.strict, "proveedores": [r.to_dict() for r in self.reports]}, f, ensure_ascii=False, indent=1)
+        return path
@@ -0,0 +1,96 @@
+import os, time, queue, importlib.util
+
+# Espera de descargas terminadas. Con watchdog (inotify en Linux) se reacciona a
+# los eventos del directorio en lugar de listarlo cada 200 ms; sin watchdog se
+# usa polling. En ambos casos un archivo se entrega recién cuando no es parcial
+# (.crdownload) y su tamaño dejó de cambiar.
+
+WATCH_BACKEND = "watchdog" if importlib.util.find_spec("watchdog") else "poll"
+POLL_INTERVAL = 0.2
+STABLE_SECS = 0.3
+PARTIAL_EXTS = (".crdownload", ".tmp", ".part")
+
+def is_partial(name: str) -> bool:
+    return name.lower().endswith(PARTIAL_EXTS)
+
+# True si el archivo existe y su tamaño no cambia durante 'secs' segundos
+def is_stable(path: str, secs: float = STABLE_SECS) -> bool:
+    try:
+        s1 = os.path.getsize(path)
+        time.sleep(secs)
+        return os.path.isfile(path) and os.path.getsize(path) == s1
+    except OSError:
+        return False
+
+def _newest(paths):
+    def mtime(p):
+        try: return os.path.getmtime(p)
+        except OSError: return 0
+    return sorted(paths, key=mtime, reverse=True)
+
+def _candidate(p: str, accept) -> bool:
+    try:
+        return not is_partial(os.path.basename(p)) and os.path.isfile(p) and accept(p)
+    except OSError:
+        return False
+
+# Archivos de dirpath que cumplen accept(path), del más nuevo al más viejo
+def scan(dirpath: str, accept) -> list:
+    return _newest([p for p in (os.path.join(dirpath, f) for f in os.listdir(dirpath)) if _candidate(p, accept)])
+
+# Espera un archivo completo en dirpath que cumpla accept(path); devuelve su ruta o None
+def wait_for_file(dirpath: str, accept, timeout: float = 35, backend: str = None):
+    backend = backend or WATCH_BACKEND
+    if backend == "watchdog":
+        try:
+            return _wait_watchdog(dirpath, accept, timeout)
+        except OSError as e:
+            # p.ej. límite de inotify alcanzado: se sigue con polling
+            print(f"[WATCH] watchdog no disponible ({e}); se usa polling")
+    return _wait_poll(dirpath, accept, timeout)
+
+def _wait_poll(dirpath, accept, timeout):
+    end = time.time() + timeout
+    while time.time() < end:
+        for p in scan(dirpath, accept):
+            if is_stable(p):
+                return p
+        time.sleep(POLL_INTERVAL)
+    return None
+
+def _wait_watchdog(dirpath, accept, timeout):
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+
+    events = queue.Queue()
+    class _Handler(FileSystemEventHandler):
+        def on_any_event(self, e):
+            if not e.is_directory:
+                # al renombrar .crdownload -> final interesa el destino
+                events.put(getattr(e, "dest_path", "") or e.src_path)
+
+    obs = Observer()
+    obs.schedule(_Handler(), dirpath, recursive=False)
+    obs.start()
+    try:
+        end = time.time() + timeout
+        # lo que ya estaba antes de empezar a observar (la descarga pudo terminar antes)
+        pending = set(scan(dirpath, accept))
+        while True:
+            for p in _newest(pending):
+                if is_stable(p):
+                    return p
+            pending = {p for p in pending if os.path.isfile(p)}
+            left = end - time.time()
+            if left <= 0:
+                return None
+            try:
+                paths = [events.get(timeout=min(left, 0.5))]
+            except queue.Empty:
+                continue
+            while not events.empty():
+                paths.append(events.get_nowait())
+            pending.update(p for p in paths if _candidate(p, accept))
+    finally:
+        obs.stop()
+        obs.join()
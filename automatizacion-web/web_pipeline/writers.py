@@ -0,0 +1,168 @@
+from datetime import datetime
+import pandas as pd
+from web_pipeline.processor import REQUIRED_HEADERS, output_path
+
+# Escritores de salida intercambiables. Todos escriben por chunks (write) y se
+# cierran al final, así sirven igual para el modo normal y para --stream:
+#   xlsx    -> xlsxwriter en modo constant_memory (openpyxl write-only si no está)
+#   csv     -> CSV UTF-8
+#   parquet -> Parquet (pyarrow), para consumidores internos
+
+FIXED_CREATED = datetime(2000, 1, 1)
+
+# Escritor XLSX incremental: xlsxwriter en modo constant_memory o, si no está
+# instalado, openpyxl write-only. Las filas se escriben en orden y no quedan en memoria.
+class XlsxStreamWriter:
+    def __init__(self, path: str, columns=REQUIRED_HEADERS):
+        self.path, self.rows = path, 0
+        try:
+            import xlsxwriter
+            self._wb = xlsxwriter.Workbook(path, {
+                "constant_memory": True, "strings_to_formulas": False,
+                "strings_to_urls": False, "nan_inf_to_errors": False,
+            })
+            # fecha fija en docProps: la misma lista da los mismos bytes (ledger de subidas)
+            self._wb.set_properties({"created": FIXED_CREATED})
+            self._ws = self._wb.add_worksheet()
+            bold = self._wb.add_format({"bold": True, "border": 1, "align": "center", "valign": "top"})
+            self._ws.write_row(0, 0, list(columns), bold)
+            self._xw = True
+        except ImportError:
+            from openpyxl import Workbook
+            self._wb = Workbook(write_only=True)
+            self._wb.properties.created = self._wb.properties.modified = FIXED_CREATED
+            self._ws = self._wb.create_sheet()
+            self._ws.append(list(columns))
+            self._xw = False
+
+    def write(self, df: pd.DataFrame):
+        vals = df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+        for row in vals:
+            self.rows += 1
+            if self._xw:
+                self._ws.write_row(self.rows, 0, row)
+            else:
+                self._ws.append(row)
+
+    def close(self):
+        if self._xw:
+            self._wb.close()
+        else:
+            self._wb.save(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# CSV UTF-8 (coma como separador, punto decimal, sin índice)
+class CsvStreamWriter:
+    def __init__(self, path: str, columns=REQUIRED_HEADERS):
+        self.path, self.rows = path, 0
+        self._f = open(path, "w", encoding="utf-8", newline="")
+        pd.DataFrame(columns=list(columns)).to_csv(self._f, index=False)
+
+    def write(self, df: pd.DataFrame):
+        df.to_csv(self._f, index=False, header=False)
+        self.rows += len(df)
+
+    def close(self):
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+NUMERIC_COLUMNS = {"PRECIO", "PRECIO_ANTERIOR"}
+
+# Parquet con pyarrow: texto como string y números (PRECIO) como float64
+class ParquetStreamWriter:
+    def __init__(self, path: str, columns=REQUIRED_HEADERS):
+        import pyarrow as pa, pyarrow.parquet as pq
+        self.path, self.rows, self.columns = path, 0, list(columns)
+        self._pa = pa
+        self._schema = None
+        self._w = None
+        self._pq = pq
+
+    def _schema_for(self, df: pd.DataFrame):
+        pa = self._pa
+        return pa.schema([(c, pa.float64() if c in NUMERIC_COLUMNS or pd.api.types.is_numeric_dtype(df[c]) else pa.string()) for c in self.columns])
+
+    def write(self, df: pd.DataFrame):
+        if self._w is None:
+            self._schema = self._schema_for(df)
+            self._w = self._pq.ParquetWriter(self.path, self._schema)
+        df = df[self.columns]
+        self._w.write_table(self._pa.Table.from_pandas(df, schema=self._schema, preserve_index=False))
+        self.rows += len(df)
+
+    def close(self):
+        if self._w is None:
+            self.write(pd.DataFrame({c: pd.Series(dtype=object) for c in self.columns}))
+        self._w.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+OUTPUT_FORMATS = {
+    "xlsx": (".xlsx", XlsxStreamWriter),
+    "csv": (".csv", CsvStreamWriter),
+    "parquet": (".parquet", ParquetStreamWriter),
+}
+
+# "xlsx,parquet" -> ["xlsx", "parquet"] (valida los nombres)
+def parse_formats(spec) -> list:
+    fmts = [f.strip().lower() for f in (spec.split(",") if isinstance(spec, str) else spec) if f and f.strip()]
+    bad = [f for f in fmts if f not in OUTPUT_FORMATS]
+    if bad or not fmts:
+        raise ValueError(f"Formato de salida inválido: {', '.join(bad) or spec!r} (opciones: {', '.join(OUTPUT_FORMATS)})")
+    return list(dict.fromkeys(fmts))
+
+# Escribe cada chunk en todos los formatos pedidos; paths[0] es la salida principal
+class OutputWriter:
+    def __init__(self, outdir: str, slug: str, formats=("xlsx",), columns=REQUIRED_HEADERS):
+        self.paths, self._writers = [], []
+        try:
+            for fmt in parse_formats(formats):
+                ext, cls = OUTPUT_FORMATS[fmt]
+                path = output_path(outdir, slug, ext)
+                self._writers.append(cls(path, columns))
+                self.paths.append(path)
+        except BaseException:
+            self.close()
+            raise
+
+    @property
+    def path(self) -> str:
+        return self.paths[0]
+
+    @property
+    def rows(self) -> int:
+        return self._writers[0].rows if self._writers else 0
+
+    def write(self, df: pd.DataFrame):
+        for w in self._writers:
+            w.write(df)
+
+    def close(self):
+        for w in self._writers:
+            w.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# Guarda un DataFrame completo en los formatos pedidos; devuelve las rutas
+def write_output(df: pd.DataFrame, outdir: str, slug: str, formats=("xlsx",), columns=None) -> list:
+    with OutputWriter(outdir, slug, formats, list(columns or df.columns)) as w:
+        w.write(df)
+    return w.paths
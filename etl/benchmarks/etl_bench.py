@@ -0,0 +1,106 @@
+import os, sys, json, time, argparse, platform, tempfile
+from datetime import datetime
+from pathlib import Path
+import pandas as pd
+import sqlalchemy
+import main as etl
+from benchmarks.synthetic import generate
+
+# Benchmark del ETL contra una base local (SQLite o DuckDB) generada con synthetic.py:
+# corre cada configuración (modo sql, sql en paralelo, resumen con ventanas, recorrido
+# único) escribiendo los CSV en un temporal y registra el tiempo de cada consulta y el
+# total. Resultado en JSON; con --baseline se compara contra una corrida anterior.
+# Se ejecuta desde etl/:  python -m benchmarks.etl_bench --backend duckdb --rows 2000000
+# El precio se guarda exacto (DECIMAL(12,2); en SQLite se lee como Decimal), pero AVG
+# devuelve DOUBLE en SQLite y DuckDB, no DECIMAL como MySQL: en modo sql algún
+# precio_promedio puede diferir en el último centavo del recorrido único.
+
+# nombre -> argumentos de main.py
+CONFIGS = {
+    "sql": [],
+    "sql_workers": ["--workers", "4"],
+    "sql_window": ["--summary", "window"],
+    "single": ["--mode", "single"],
+}
+
+def run_config(name: str, backend: str, db_file: str, repeat: int = 1) -> list:
+    best = None
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as tmp:
+            args = etl.parse_args(["--outdir", tmp, "--backend", backend, "--db_file", db_file] + CONFIGS[name])
+            engine = etl.make_engine(args)
+            outdir = Path(tmp)
+            per, t = {}, time.perf_counter()
+            if args.mode == "single":
+                frames = etl.run_single_pass(engine, args.chunksize)
+                per["recorrido"] = time.perf_counter() - t
+                etl.write_outputs(frames, outdir)
+            else:
+                frames = etl.run_sql(engine, args.workers, summary=args.summary, timings=per,
+                                     on_ready=lambda key, df: etl.write_dataset(key, df, outdir))
+                etl.write_resumen(frames, outdir)
+            per["total"] = time.perf_counter() - t
+            engine.dispose()
+        if best is None or per["total"] < best["total"]:
+            best = per
+    return [{"config": name, "query": q, "seconds": round(s, 4)} for q, s in best.items()]
+
+# Compara contra una corrida previa; devuelve las mediciones más lentas que el umbral
+def compare(results: list, baseline_path: str, threshold: float = 1.2) -> list:
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        prev = {(r["config"], r["query"]): r for r in json.load(f)["results"]}
+    slower = []
+    for r in results:
+        p = prev.get((r["config"], r["query"]))
+        if not p or not p["seconds"]:
+            continue
+        ratio = r["seconds"] / p["seconds"]
+        flag = "REGRESION" if ratio > threshold else ""
+        print(f"[BENCH] {r['config']:<12} {r['query']:<14} {p['seconds']:8.3f} -> {r['seconds']:8.3f} s (x{ratio:.2f}) {flag}")
+        if flag:
+            slower.append(r)
+    return slower
+
+if __name__ == "__main__":
+    a = argparse.ArgumentParser(description="Benchmark del ETL sobre una base SQLite/DuckDB sintética")
+    a.add_argument("--backend", choices=["sqlite", "duckdb"], default="sqlite",
+                   help="precios exactos en ambos; AVG en DOUBLE (algún precio_promedio puede diferir en un centavo)")
+    a.add_argument("--db_file", default=None, help="Base a usar (por defecto ./data/bench/repuestos.<backend>)")
+    a.add_argument("--rows", type=int, default=1_000_000, help="Repuestos a generar si la base no existe")
+    a.add_argument("--seed", type=int, default=0)
+    a.add_argument("--regenerate", action="store_true", help="Regenera la base aunque exista")
+    a.add_argument("--configs", default=",".join(CONFIGS), help=f"Separadas por coma: {', '.join(CONFIGS)}")
+    a.add_argument("--repeat", type=int, default=1)
+    a.add_argument("--out", default=None)
+    a.add_argument("--baseline", default=None)
+    a.add_argument("--threshold", type=float, default=1.2)
+    args = a.parse_args()
+
+    db_file = args.db_file or f"./data/bench/repuestos.{args.backend}"
+    if args.regenerate or not os.path.exists(db_file):
+        generate(db_file, args.backend, args.rows, seed=args.seed)
+    configs = [c.strip() for c in args.configs.split(",") if c.strip()]
+    if args.backend == "sqlite":
+        configs = [c for c in configs if c != "sql_window"]  # SQLite no tiene ROLLUP
+    etl.use_backend(args.backend)
+
+    results = []
+    for name in configs:
+        res = run_config(name, args.backend, db_file, args.repeat)
+        results += res
+        for r in res:
+            print(f"[BENCH] {name:<12} {r['query']:<14} {r['seconds']:8.3f} s")
+
+    out = args.out or os.path.join(os.path.dirname(db_file) or ".", f"etl_bench_{datetime.now().strftime('%Y-%m-%d_%H%M%S')}.json")
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump({
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "params": {"backend": args.backend, "db_file": db_file, "db_mb": round(os.path.getsize(db_file) / (1 << 20), 1),
+                       "configs": configs, "repeat": args.repeat},
+            "env": {"python": platform.python_version(), "pandas": pd.__version__, "sqlalchemy": sqlalchemy.__version__,
+                    "platform": platform.platform(), "cpus": os.cpu_count()},
+            "results": results,
+        }, f, ensure_ascii=False, indent=1)
+    print(f"[BENCH] resultados -> {out}")
+    if args.baseline and compare(results, args.baseline, args.threshold):
+        sys.exit(1)
@@ -0,0 +1,177 @@
+import os, time, argparse, sqlite3
+import datetime as dt
+import numpy as np
+import pandas as pd
+
+# Base sintética con el esquema de la consigna (Repuesto, Proveedor, Marca,
+# Actualizacion) en un archivo SQLite o DuckDB, para correr el ETL sin MySQL.
+# Distribuciones con sesgo parecido al real:
+#   - pocos proveedores concentran la mayoría de los repuestos (Zipf), las marcas igual
+#   - precios log-normales, muchos redondeados a la centena (empates en el más caro)
+#   - cada proveedor actualiza cada ~semana; la mayoría de los repuestos apunta a una
+#     de las últimas actualizaciones de su proveedor, algunos a viejas o a ninguna
+#   - descripciones NULL / vacías / solo espacios y algunos precios, marcas o proveedores NULL
+# Los ids de Actualizacion crecen con la fecha, como en la base real (modo incremental).
+# En SQLite el precio se carga como texto decimal en una columna DECIMAL(12,2): queda
+# exacto (2 decimales, menos de 15 dígitos) y main.py lo lee como Decimal, igual que de MySQL.
+
+PROVEEDORES = ["AUTOFIX", "AUTOREPUESTOS EXPRESS", "AUTOMAX", "MUNDO REPCAR"]
+MARCAS = ["ELEXA", "BERU", "SH", "MASTERFILT", "RN", "BOSCH", "NGK", "FRAM", "MAHLE", "VALEO", "CORVEN", "FERODO"]
+PIEZAS = ["Bujía", "Filtro aceite", "Pastilla freno", "Amortiguador", "Correa distribución", "Bomba agua", "Embrague kit"]
+
+DDL = {
+    "sqlite": """
+CREATE TABLE Proveedor (id INTEGER PRIMARY KEY, nombre TEXT);
+CREATE TABLE Marca (id INTEGER PRIMARY KEY, nombre TEXT);
+CREATE TABLE Actualizacion (id INTEGER PRIMARY KEY, fecha TEXT, id_proveedor INTEGER);
+CREATE TABLE Repuesto (id INTEGER PRIMARY KEY, codigo TEXT, descripcion TEXT, id_marca INTEGER,
+                       precio DECIMAL(12,2), proveedor_id INTEGER, id_ultima_actualizacion INTEGER);
+""",
+    "duckdb": """
+CREATE TABLE Proveedor (id INTEGER PRIMARY KEY, nombre VARCHAR);
+CREATE TABLE Marca (id INTEGER PRIMARY KEY, nombre VARCHAR);
+CREATE TABLE Actualizacion (id INTEGER PRIMARY KEY, fecha TIMESTAMP, id_proveedor INTEGER);
+CREATE TABLE Repuesto (id INTEGER, codigo VARCHAR, descripcion VARCHAR, id_marca INTEGER,
+                       precio DECIMAL(12,2), proveedor_id INTEGER, id_ultima_actualizacion INTEGER);
+""",
+}
+
+# Los índices que MySQL crea para las claves foráneas; se arman después de cargar
+INDEXES = """
+CREATE INDEX idx_repuesto_proveedor ON Repuesto (proveedor_id);
+CREATE INDEX idx_repuesto_marca ON Repuesto (id_marca);
+CREATE INDEX idx_repuesto_actualizacion ON Repuesto (id_ultima_actualizacion);
+CREATE INDEX idx_actualizacion_proveedor ON Actualizacion (id_proveedor);
+"""
+
+# Pesos Zipf (el primero es el más grande)
+def _zipf(n, s=1.1):
+    w = 1 / np.arange(1, n + 1) ** s
+    return w / w.sum()
+
+def _names(base, n, prefix):
+    return (base + [f"{prefix} {i:03d}" for i in range(len(base) + 1, n + 1)])[:n]
+
+# Actualizaciones semanales por proveedor en el último año, con ids ordenados por fecha.
+# Devuelve (DataFrame, {proveedor_id: array de ids de más vieja a más nueva})
+def make_actualizaciones(rng, n_prov, days=365):
+    now = dt.datetime.now().replace(microsecond=0)
+    recs = []
+    for pid in range(1, n_prov + 1):
+        start = rng.integers(0, 7)
+        for d in range(start, days, 7):
+            recs.append((now - dt.timedelta(days=int(d), seconds=int(rng.integers(0, 86_400))), pid))
+    df = pd.DataFrame(recs, columns=["fecha", "id_proveedor"]).sort_values("fecha", kind="stable")
+    df.insert(0, "id", np.arange(1, len(df) + 1))
+    return df, {pid: g["id"].to_numpy() for pid, g in df.groupby("id_proveedor")}
+
+def make_repuestos(rng, start, n, prov_w, marca_w, act_ids):
+    ids = np.arange(start, start + n)
+    prov = rng.choice(len(prov_w), n, p=prov_w) + 1
+    precio = np.round(np.maximum(rng.lognormal(np.log(20_000), 1.0, n), 50), 2)
+    redondo = rng.random(n) < 0.3
+    precio[redondo] = np.round(precio[redondo], -2)
+    desc = pd.Series(np.asarray(PIEZAS, dtype=object)[rng.integers(0, len(PIEZAS), n)]) + " " + pd.Series(ids).astype(str)
+    r = rng.random(n)
+    desc[r < 0.04] = None
+    desc[(r >= 0.04) & (r < 0.06)] = ""
+    desc[(r >= 0.06) & (r < 0.07)] = "   "
+    # la mayoría apunta a una de las últimas actualizaciones de su proveedor
+    atras = rng.geometric(0.35, n) - 1
+    act = np.zeros(n, dtype=np.int64)
+    for pid, ids_p in act_ids.items():
+        m = prov == pid
+        act[m] = ids_p[np.maximum(len(ids_p) - 1 - atras[m], 0)]
+    df = pd.DataFrame({
+        "id": ids,
+        "codigo": pd.Series(rng.integers(1, 9_999_999, n)).map("R{:07d}".format),
+        "descripcion": desc,
+        "id_marca": pd.array(rng.choice(len(marca_w), n, p=marca_w) + 1, dtype="Int64"),
+        "precio": pd.array(precio, dtype="Float64"),
+        "proveedor_id": pd.array(prov, dtype="Int64"),
+        "id_ultima_actualizacion": pd.array(act, dtype="Int64"),
+    })
+    df.loc[rng.random(n) < 0.02, "id_marca"] = pd.NA
+    df.loc[rng.random(n) < 0.005, "precio"] = pd.NA
+    df.loc[rng.random(n) < 0.002, "proveedor_id"] = pd.NA
+    df.loc[rng.random(n) < 0.03, "id_ultima_actualizacion"] = pd.NA
+    return df
+
+class _SqliteLoader:
+    def __init__(self, path):
+        self.con = sqlite3.connect(path)
+        self.con.execute("PRAGMA journal_mode = OFF")
+        self.con.execute("PRAGMA synchronous = OFF")
+
+    def script(self, sql):
+        self.con.executescript(sql)
+
+    def insert(self, table, df):
+        df = df.astype(object).where(df.notna(), None)
+        if "precio" in df:
+            df["precio"] = df["precio"].map(lambda v: None if v is None else f"{v:.2f}")
+        rows = df.itertuples(index=False, name=None)
+        if table == "Actualizacion":
+            rows = ((i, f.strftime("%Y-%m-%d %H:%M:%S"), p) for i, f, p in rows)
+        self.con.executemany(f"INSERT INTO {table} VALUES ({', '.join('?' * len(df.columns))})", rows)
+
+    def close(self):
+        self.con.commit()
+        self.con.close()
+
+class _DuckdbLoader:
+    def __init__(self, path):
+        import duckdb
+        self.con = duckdb.connect(path)
+
+    def script(self, sql):
+        self.con.execute(sql)
+
+    def insert(self, table, df):
+        self.con.register("_lote", df)
+        self.con.execute(f"INSERT INTO {table} SELECT * FROM _lote")
+        self.con.unregister("_lote")
+
+    def close(self):
+        self.con.close()
+
+LOADERS = {"sqlite": _SqliteLoader, "duckdb": _DuckdbLoader}
+
+# Genera la base en path (la reemplaza si existe); rows repuestos en lotes de chunk
+def generate(path, backend="sqlite", rows=1_000_000, proveedores=40, marcas=300, seed=0, chunk=500_000) -> str:
+    t = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    if os.path.exists(path):
+        os.remove(path)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    db = LOADERS[backend](path)
+    try:
+        db.script(DDL[backend])
+        db.insert("Proveedor", pd.DataFrame({"id": np.arange(1, proveedores + 1),
+                                             "nombre": _names(PROVEEDORES, proveedores, "PROVEEDOR")}))
+        db.insert("Marca", pd.DataFrame({"id": np.arange(1, marcas + 1), "nombre": _names(MARCAS, marcas, "MARCA")}))
+        acts, act_ids = make_actualizaciones(rng, proveedores)
+        db.insert("Actualizacion", acts)
+        # las marcas con más artículos no son siempre las primeras de la lista
+        marca_w = rng.permutation(_zipf(marcas, 0.9))
+        prov_w = _zipf(proveedores)
+        for start in range(1, rows + 1, chunk):
+            db.insert("Repuesto", make_repuestos(rng, start, min(chunk, rows + 1 - start), prov_w, marca_w, act_ids))
+        db.script(INDEXES)
+    finally:
+        db.close()
+    print(f"[GEN] {backend}: {path} ({rows:,} repuestos, {proveedores} proveedores, {marcas} marcas, "
+          f"{len(acts):,} actualizaciones) en {time.perf_counter() - t:.1f}s")
+    return path
+
+if __name__ == "__main__":
+    a = argparse.ArgumentParser(description="Genera una base SQLite/DuckDB sintética con el esquema del ETL")
+    a.add_argument("--backend", choices=list(LOADERS), default="sqlite")
+    a.add_argument("--out", default=None, help="Archivo de salida (por defecto ./data/bench/repuestos.<backend>)")
+    a.add_argument("--rows", type=int, default=1_000_000)
+    a.add_argument("--proveedores", type=int, default=40)
+    a.add_argument("--marcas", type=int, default=300)
+    a.add_argument("--seed", type=int, default=0)
+    args = a.parse_args()
+    generate(args.out or f"./data/bench/repuestos.{args.backend}", args.backend, args.rows,
+             args.proveedores, args.marcas, args.seed)
@@ -1,15 +1,26 @@
 from __future__ import annotations
 
 import argparse
+import gzip
+import io
 import os
+import pickle
+import re
+import sqlite3
+import time
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from decimal import Decimal, ROUND_HALF_UP, localcontext
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import DBAPIError
 
 # ---------------- CLI ----------------
 
-def parse_args() -> argparse.Namespace:
+def parse_args(argv=None) -> argparse.Namespace:
     p = argparse.ArgumentParser(description="ETL Parte 2 - SQL puro + pandas (esquema exacto de la consigna)")
     p.add_argument("--outdir", required=True, help="Carpeta de salida para los CSVs")
     p.add_argument("--host", default=os.getenv("MYSQL_HOST", "localhost"))
@@ -17,20 +28,143 @@ def parse_args() -> argparse.Namespace:
     p.add_argument("--user", default=os.getenv("MYSQL_USER", "root"))
     p.add_argument("--password", default=os.getenv("MYSQL_PASSWORD", ""))
     p.add_argument("--database", default=os.getenv("MYSQL_DB", "boxer"))
-    return p.parse_args()
+    p.add_argument("--backend", choices=BACKENDS, default="mysql",
+                   help="mysql (servidor) o una base local sqlite/duckdb en --db_file (ver benchmarks/synthetic.py)")
+    p.add_argument("--db_file", default=None, help="Archivo de la base con --backend sqlite/duckdb")
+    p.add_argument("--mode", choices=["sql", "single", "incremental"], default="sql",
+                   help="sql: una consulta por dataset; single: un solo recorrido de Repuesto para los cinco; "
+                        "incremental: solo lo actualizado desde la corrida anterior (watermark en --state_file)")
+    p.add_argument("--state_file", default=None,
+                   help="Estado del modo incremental (por defecto <outdir>/.etl_incremental.pkl)")
+    p.add_argument("--full", action="store_true", help="Modo incremental: recorre todo y regenera el estado")
+    p.add_argument("--chunksize", type=int, default=50_000, help="Filas por lote del cursor (modo single y --stream)")
+    p.add_argument("--workers", type=int, default=1,
+                   help="Consultas simultáneas en modo sql (cada una con su conexión del pool)")
+    p.add_argument("--pool_size", type=int, default=None,
+                   help="Conexiones del pool (por defecto = --workers; si es menor, se usan esos hilos)")
+    p.add_argument("--stream", action="store_true",
+                   help="Modo sql: los datasets de filas se exportan por lotes (cursor del servidor) sin cargarlos enteros")
+    p.add_argument("--summary", choices=["join", "window"], default="join",
+                   help="Modo sql: join = resumen y promedios por separado (el resumen repite proveedor si hay "
+                        "empate en el más caro); window = una sola consulta con ROW_NUMBER y ROLLUP, "
+                        "el más caro desempata por menor id")
+    p.add_argument("--sargable", action="store_true",
+                   help="Modo sql: usa las versiones sargables de autofix/+15%%/recargo (sin UPPER ni DATE sobre columnas)")
+    p.add_argument("--profile", action="store_true",
+                   help="No exporta: EXPLAIN ANALYZE de cada consulta, índices sugeridos y reescrituras sargables")
+    p.add_argument("--create_indexes", action="store_true", help="Con --profile: crea los índices sugeridos que falten")
+    p.add_argument("--compress", choices=list(COMPRESSION), default="none",
+                   help="Comprime los CSV al escribirlos (.gz / .zst; zstd requiere el paquete zstandard)")
+    args = p.parse_args(argv)
+    if args.backend != "mysql" and not args.db_file:
+        p.error(f"--backend {args.backend} requiere --db_file")
+    if args.backend == "sqlite" and args.summary == "window":
+        p.error("--summary window usa ROLLUP, que SQLite no tiene")
+    if args.profile and args.backend != "mysql":
+        p.error("--profile usa EXPLAIN ANALYZE e information_schema de MySQL")
+    return args
 
 def ensure_outdir(path: str | Path) -> Path:
     out = Path(path)
     out.mkdir(parents=True, exist_ok=True)
     return out
 
+# Pool acotado: pool_size conexiones persistentes y sin overflow, así las consultas en
+# paralelo nunca abren más conexiones que las configuradas
 def make_engine(args):
-    url = f"mysql+pymysql://{args.user}:{args.password}@{args.host}:{args.port}/{args.database}?charset=utf8mb4"
-    return create_engine(url, pool_pre_ping=True)
+    if args.backend == "mysql":
+        url = f"mysql+pymysql://{args.user}:{args.password}@{args.host}:{args.port}/{args.database}?charset=utf8mb4"
+    else:
+        url = f"{args.backend}:///{Path(args.db_file).resolve()}"
+    pool_size = max(1, args.pool_size or args.workers)
+    if args.backend == "sqlite":
+        # DECIMAL(12,2) de la base sintética como Decimal (si no, llega como float y el
+        # recorrido único emularía DOUBLE en vez del DECIMAL del modo sql)
+        sqlite3.register_converter("DECIMAL", lambda b: Decimal(b.decode()).quantize(Decimal("0.01")))
+        connect_args = {"detect_types": sqlite3.PARSE_DECLTYPES}
+    else:
+        connect_args = {}
+    engine = create_engine(url, connect_args=connect_args, pool_pre_ping=True, pool_size=pool_size, max_overflow=0,
+                           pool_timeout=60, pool_recycle=3600)
+    if args.backend == "duckdb":
+        # NULL primero en ASC y último en DESC, como MySQL (DuckDB los pone siempre al final)
+        @event.listens_for(engine, "connect")
+        def _null_order(dbapi_conn, _):
+            dbapi_conn.execute("SET default_null_order = 'nulls_first_on_asc_last_on_desc'")
+    return engine
 
-def to_csv(df: pd.DataFrame, path: Path) -> None:
-    df.to_csv(path, index=False, encoding="utf-8")
-    print(f"[OK] CSV -> {path} ({len(df):,} filas)")
+# ---------------- Backends locales ----------------
+# Las consultas están escritas para MySQL; para sqlite/duckdb se traduce lo que no es
+# portable (regex -> reemplazo). El resto (UPPER, TRIM, ROUND, CASE, ventanas) es común.
+# La base local se arma con benchmarks/synthetic.py (duckdb requiere duckdb y duckdb_engine).
+BACKENDS = ("mysql", "sqlite", "duckdb")
+
+DIALECT_SQL = {
+    "sqlite": [
+        (r"DATE_SUB\(CURDATE\(\), INTERVAL 1 MONTH\)", "date('now', 'localtime', '-1 month')"),
+    ],
+    "duckdb": [
+        (r"DATE_SUB\(CURDATE\(\), INTERVAL 1 MONTH\)", "CAST(current_date - INTERVAL 1 MONTH AS DATE)"),
+        (r"GROUP BY (.+) WITH ROLLUP", r"GROUP BY ROLLUP (\1)"),
+    ],
+}
+
+def portable(sql: str, backend: str) -> str:
+    for pattern, repl in DIALECT_SQL.get(backend, []):
+        sql = re.sub(pattern, repl, sql)
+    return sql
+
+# Pasa todas las SQL_* (y las de QUERIES / SARGABLE) al dialecto del backend
+def use_backend(backend: str) -> None:
+    g = globals()
+    for name in [k for k, v in g.items() if k.startswith("SQL_") and isinstance(v, str)]:
+        g[name] = portable(g[name], backend)
+    for queries in (QUERIES, SARGABLE):
+        for key in queries:
+            queries[key] = portable(queries[key], backend)
+
+COMPRESSION = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+# Fechas siempre con hora: así el formato no depende de qué filas caen en cada lote
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# CSV UTF-8 escrito por lotes (encabezado una sola vez), opcionalmente comprimido al vuelo.
+# gzip sin nombre ni fecha en la cabecera: mismo contenido -> mismos bytes.
+class CsvWriter:
+    def __init__(self, path: Path, compression: str = "none"):
+        self.path = path.with_name(path.name + COMPRESSION[compression])
+        self.rows, self._header = 0, True
+        self._raw = open(self.path, "wb")
+        if compression == "gzip":
+            self._inner = gzip.GzipFile(filename="", mode="wb", fileobj=self._raw, mtime=0)
+        elif compression == "zstd":
+            import zstandard
+            self._inner = zstandard.ZstdCompressor(level=3).stream_writer(self._raw, closefd=False)
+        else:
+            self._inner = None
+        self._f = io.TextIOWrapper(self._inner or self._raw, encoding="utf-8", newline="")
+
+    def write(self, df: pd.DataFrame) -> None:
+        if not self._header and df.empty:
+            return
+        df.to_csv(self._f, index=False, header=self._header, date_format=DATE_FORMAT)
+        self._header = False
+        self.rows += len(df)
+
+    def close(self) -> None:
+        self._f.close()  # cierra también el compresor
+        if not self._raw.closed:
+            self._raw.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def to_csv(df: pd.DataFrame, path: Path, compression: str = "none") -> None:
+    with CsvWriter(path, compression) as w:
+        w.write(df)
+    print(f"[OK] CSV -> {w.path} ({len(df):,} filas)")
 
 # Autofix cuyo precio NO se actualizó en el último mes
 SQL_AUTOFIX_NO_ACT = """
@@ -65,7 +199,7 @@ FROM Repuesto r
 JOIN Marca m         ON m.id = r.id_marca
 LEFT JOIN Proveedor p ON p.id = r.proveedor_id
 WHERE UPPER(m.nombre) IN ('ELEXA','BERU','SH','MASTERFILT','RN')
-ORDER BY m.nombre, r.codigo;
+ORDER BY m.nombre, r.codigo, r.id;
 """
 
 # +30% para AutoRepuestos Express y Automax con 50k < precio < 100k
@@ -83,7 +217,7 @@ JOIN Proveedor p ON p.id = r.proveedor_id
 LEFT JOIN Marca m ON m.id = r.id_marca
 WHERE UPPER(p.nombre) IN ('AUTOREPUESTOS EXPRESS','AUTOMAX')
   AND r.precio > 50000 AND r.precio < 100000
-ORDER BY p.nombre, r.precio DESC;
+ORDER BY p.nombre, r.precio DESC, r.id;
 """
 
 # Resumen por proveedor
@@ -110,7 +244,7 @@ FROM (
 ) t
 JOIN Repuesto r
   ON r.proveedor_id = t.proveedor_id AND r.precio = t.precio_mas_caro
-ORDER BY t.proveedor;
+ORDER BY t.proveedor, r.id;
 """
 
 # Promedio por marca dentro de cada proveedor
@@ -125,29 +259,690 @@ FROM Repuesto r
 JOIN Proveedor p ON p.id = r.proveedor_id
 JOIN Marca m     ON m.id = r.id_marca
 GROUP BY p.id, p.nombre, m.id, m.nombre
-ORDER BY p.nombre, m.nombre;
+ORDER BY p.nombre, m.nombre, p.id, m.id;
 """
 
-# Main 
+# Resumen por proveedor y promedio por marca en un solo recorrido de Repuesto
+# (--summary window). ROW_NUMBER elige el más caro de cada proveedor sin volver a
+# unir contra Repuesto; ante empates queda el de menor id (una fila por proveedor).
+# WITH ROLLUP arma los dos niveles en la misma agrupación: (proveedor, marca) para
+# los promedios y (proveedor) para el resumen, que GROUPING() distingue.
+SQL_RESUMEN_VENTANA = """
+WITH base AS (
+  SELECT
+    r.id, r.codigo, r.descripcion, r.precio, r.proveedor_id, r.id_marca,
+    ROW_NUMBER() OVER (PARTITION BY r.proveedor_id ORDER BY r.precio IS NULL, r.precio DESC, r.id) AS rn
+  FROM Repuesto r
+  JOIN Proveedor p ON p.id = r.proveedor_id
+),
+agg AS (
+  SELECT
+    b.proveedor_id,
+    b.id_marca,
+    GROUPING(b.id_marca) AS es_proveedor,
+    COUNT(*) AS total_repuestos,
+    SUM(CASE WHEN b.descripcion IS NULL OR TRIM(b.descripcion) = '' THEN 1 ELSE 0 END) AS sin_descripcion,
+    MAX(CASE WHEN b.rn = 1 AND b.precio IS NOT NULL THEN b.id END)          AS repuesto_id_mas_caro,
+    MAX(CASE WHEN b.rn = 1 AND b.precio IS NOT NULL THEN b.codigo END)      AS codigo_mas_caro,
+    MAX(CASE WHEN b.rn = 1 AND b.precio IS NOT NULL THEN b.descripcion END) AS descripcion_mas_caro,
+    MAX(CASE WHEN b.rn = 1 THEN b.precio END)                               AS precio_mas_caro,
+    ROUND(AVG(b.precio), 2) AS precio_promedio
+  FROM base b
+  GROUP BY b.proveedor_id, b.id_marca WITH ROLLUP
+)
+SELECT
+  agg.es_proveedor,
+  agg.proveedor_id,
+  p.nombre AS proveedor,
+  agg.total_repuestos,
+  agg.sin_descripcion,
+  agg.repuesto_id_mas_caro,
+  agg.codigo_mas_caro,
+  agg.descripcion_mas_caro,
+  agg.precio_mas_caro,
+  m.id     AS marca_id,
+  m.nombre AS marca,
+  agg.precio_promedio
+FROM agg
+JOIN Proveedor p  ON p.id = agg.proveedor_id
+LEFT JOIN Marca m ON m.id = agg.id_marca AND agg.es_proveedor = 0
+WHERE agg.es_proveedor = 1 OR m.id IS NOT NULL
+ORDER BY p.nombre, m.nombre, CASE WHEN agg.es_proveedor = 1 THEN agg.repuesto_id_mas_caro END, p.id, m.id;
+"""
 
-def main():
-    args = parse_args()
-    outdir = ensure_outdir(args.outdir)
-    engine = make_engine(args)
+# Nombres de archivo de cada dataset
+OUTPUTS = {
+    "autofix": "autofix_no_actualizados_ultimo_mes.csv",
+    "inc15": "precio_propuesto_15_marcas_seleccionadas.csv",
+    "recargo": "recargo_30_autorepuestos_automax_50k_100k.csv",
+}
+
+QUERIES = {
+    "autofix": SQL_AUTOFIX_NO_ACT,
+    "inc15": SQL_INC_15,
+    "recargo": SQL_RECARGO_30,
+    "resumen": SQL_RESUMEN_PROV,
+    "prom": SQL_PROM_MARCA_EN_PROV,
+}
+
+# Reescrituras sargables (--sargable): mismas filas, pero el filtro queda sobre la
+# columna sin funciones y puede usar un índice. Equivalentes siempre que nombre tenga
+# intercalación _ci (comparar sin UPPER) y fecha sea DATETIME/DATE:
+# DATE(f) < d  <=>  f < d (d a las 00:00). --profile lo verifica contra el esquema.
+SQL_AUTOFIX_NO_ACT_SARG = SQL_AUTOFIX_NO_ACT.replace(
+    "WHERE UPPER(p.nombre) = 'AUTOFIX'", "WHERE p.nombre = 'AUTOFIX'").replace(
+    "DATE(a.fecha) < DATE_SUB", "a.fecha < DATE_SUB")
+SQL_INC_15_SARG = SQL_INC_15.replace("WHERE UPPER(m.nombre) IN", "WHERE m.nombre IN")
+SQL_RECARGO_30_SARG = SQL_RECARGO_30.replace("WHERE UPPER(p.nombre) IN", "WHERE p.nombre IN")
+
+SARGABLE = {
+    "autofix": SQL_AUTOFIX_NO_ACT_SARG,
+    "inc15": SQL_INC_15_SARG,
+    "recargo": SQL_RECARGO_30_SARG,
+}
+
+# Corre una consulta con su propia conexión del pool; devuelve (df, segundos)
+def read_query(engine, key: str) -> tuple[pd.DataFrame, float]:
+    t = time.perf_counter()
+    with engine.connect() as conn:
+        df = pd.read_sql(QUERIES[key], con=conn)
+    return df, time.perf_counter() - t
+
+# --summary window: una consulta para resumen y prom; las filas se separan por nivel
+# del ROLLUP y se arman con from_records como read_sql, con las columnas de siempre.
+# Devuelve ({"resumen": df, "prom": df}, segundos)
+def read_summary_window(engine) -> tuple[dict[str, pd.DataFrame], float]:
+    t = time.perf_counter()
+    with engine.connect() as conn:
+        result = conn.execute(text(SQL_RESUMEN_VENTANA))
+        keys, rows = list(result.keys()), result.all()
+    nivel = keys.index("es_proveedor")
+
+    def frame(cols, es_proveedor):
+        idx = [keys.index(c) for c in cols]
+        recs = [tuple(r[i] for i in idx) for r in rows if r[nivel] == es_proveedor]
+        return pd.DataFrame.from_records(recs, columns=cols, coerce_float=True)
+
+    resumen = frame(COLS_RESUMEN, 1)
+    # un proveedor sin ningún precio queda con el más caro vacío (con el join no aparecía);
+    # Int64 para que el id no pase a float en el CSV
+    resumen["repuesto_id_mas_caro"] = resumen["repuesto_id_mas_caro"].astype("Int64")
+    return {"resumen": resumen, "prom": frame(COLS_PROM, 0)}, time.perf_counter() - t
+
+# Exporta una consulta directo a CSV por lotes: cursor del lado del servidor
+# (stream_results) y read_sql con chunksize; en memoria hay un lote a la vez.
+# Devuelve (filas, segundos)
+def export_query(engine, key: str, path: Path, chunksize: int = 50_000, compression: str = "none") -> tuple[int, float]:
+    t = time.perf_counter()
+    with engine.connect() as conn, CsvWriter(path, compression) as w:
+        conn = conn.execution_options(stream_results=True, max_row_buffer=chunksize)
+        for chunk in pd.read_sql(QUERIES[key], con=conn, chunksize=chunksize):
+            w.write(chunk)
+    print(f"[OK] CSV -> {w.path} ({w.rows:,} filas, por lotes de {chunksize:,})")
+    return w.rows, time.perf_counter() - t
+
+# Modo sql: una consulta por dataset. Con workers > 1 las consultas (independientes
+# entre sí) corren en paralelo y on_ready(key, df) se llama apenas termina cada una,
+# así la escritura de un CSV se superpone con las consultas que siguen corriendo.
+# stream_dir: los datasets de filas se exportan por lotes ahí (export_query) y no
+# quedan en el resultado; solo vuelven los DataFrames de resumen.
+# timings: si se pasa, recibe {key: segundos} de cada consulta (benchmarks/etl_bench.py)
+def run_sql(engine, workers: int = 1, on_ready=None, stream_dir: Path = None,
+            chunksize: int = 50_000, compression: str = "none", summary: str = "join",
+            timings: dict = None) -> dict[str, pd.DataFrame]:
+    frames, t0 = {}, time.perf_counter()
+    keys = list(QUERIES)
+    if summary == "window":
+        keys = [k for k in keys if k not in ("resumen", "prom")] + ["resumen+prom"]
+
+    def job(key):
+        if key == "resumen+prom":
+            return read_summary_window(engine)
+        if stream_dir is not None and key in OUTPUTS:
+            return export_query(engine, key, stream_dir / OUTPUTS[key], chunksize, compression)
+        return read_query(engine, key)
+
+    def done(key, res, secs):
+        parts = res if isinstance(res, dict) else {key: res}
+        n = sum(p if isinstance(p, int) else len(p) for p in parts.values())
+        print(f"[TIEMPO] {key}: {secs:.2f}s ({n:,} filas)")
+        if timings is not None:
+            timings[key] = secs
+        for k, df in parts.items():
+            if isinstance(df, pd.DataFrame):
+                frames[k] = df
+                if on_ready:
+                    on_ready(k, df)
+
+    # nunca más hilos que conexiones del pool: un hilo sin conexión esperaría pool_timeout
+    # y fallaría si otra consulta tarda más que eso
+    pool = getattr(engine.pool, "size", None)
+    workers = min(workers, pool()) if callable(pool) else workers
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=min(workers, len(keys)), thread_name_prefix="sql") as ex:
+            futures = {ex.submit(job, key): key for key in keys}
+            for f in as_completed(futures):
+                done(futures[f], *f.result())
+    else:
+        for key in keys:
+            done(key, *job(key))
+    print(f"[TIEMPO] consultas: {time.perf_counter() - t0:.2f}s (workers={max(1, workers)})")
+    return frames
+
+# ---------------- Modo single: un solo recorrido ----------------
+# Repuesto se lee una vez (cursor del lado del servidor, por lotes) con sus joins y los
+# cinco datasets se arman en pandas replicando la semántica de las consultas SQL:
+# mismos filtros, ROUND/AVG de MySQL sobre DECIMAL, NULLs y orden. Las filas de salida
+# se arman con los valores crudos del driver y se pasan por DataFrame.from_records igual
+# que pd.read_sql, así los tipos (y el CSV) quedan iguales a los del modo sql.
+
+_REPUESTOS_SELECT = """
+SELECT
+  r.id                AS repuesto_id,
+  r.codigo            AS codigo,
+  r.descripcion       AS descripcion,
+  r.precio            AS precio,
+  p.id                AS proveedor_id,
+  p.nombre            AS proveedor,
+  m.id                AS marca_id,
+  m.nombre            AS marca,
+  a.fecha             AS fecha_ultima_actualizacion,
+  a.id                AS actualizacion_id,
+  a.id_proveedor      AS actualizacion_proveedor_id
+FROM Repuesto r
+LEFT JOIN Proveedor p     ON p.id = r.proveedor_id
+LEFT JOIN Marca m         ON m.id = r.id_marca
+LEFT JOIN Actualizacion a ON a.id = r.id_ultima_actualizacion
+"""
+
+SQL_REPUESTOS_JOIN = _REPUESTOS_SELECT + ";"
+
+# Modo incremental: solo repuestos cuya última actualización es posterior al watermark
+SQL_REPUESTOS_CAMBIOS = _REPUESTOS_SELECT + "WHERE a.id > :desde;"
 
-    df_autofix = pd.read_sql(SQL_AUTOFIX_NO_ACT, con=engine)
-    to_csv(df_autofix, outdir / "autofix_no_actualizados_ultimo_mes.csv")
+# Más caro de un proveedor (modo incremental, cuando cambió el que era el máximo)
+SQL_MAS_CARO_PROVEEDOR = """
+SELECT r.id, r.codigo, r.descripcion, r.precio
+FROM Repuesto r
+WHERE r.proveedor_id = :pid
+  AND r.precio = (SELECT MAX(precio) FROM Repuesto WHERE proveedor_id = :pid);
+"""
+
+# Fecha de corte calculada por el servidor (misma CURDATE() que SQL_AUTOFIX_NO_ACT)
+SQL_CORTE_ULTIMO_MES = "SELECT DATE_SUB(CURDATE(), INTERVAL 1 MONTH) AS corte;"
+
+# Mismos filtros que en las consultas SQL
+PROV_AUTOFIX = ("AUTOFIX",)
+MARCAS_15 = ("ELEXA", "BERU", "SH", "MASTERFILT", "RN")
+PROV_RECARGO_30 = ("AUTOREPUESTOS EXPRESS", "AUTOMAX")
+RANGO_RECARGO_30 = (50000, 100000)
+
+COLS_AUTOFIX = ["repuesto_id", "codigo", "descripcion", "marca", "proveedor", "precio_actual", "fecha_ultima_actualizacion"]
+COLS_INC_15 = ["repuesto_id", "codigo", "descripcion", "marca", "proveedor", "precio_actual", "precio_propuesto_15"]
+COLS_RECARGO_30 = ["repuesto_id", "codigo", "descripcion", "marca", "proveedor", "precio_actual", "precio_con_recargo_30"]
+COLS_RESUMEN = ["proveedor_id", "proveedor", "total_repuestos", "sin_descripcion",
+                "repuesto_id_mas_caro", "codigo_mas_caro", "descripcion_mas_caro", "precio_mas_caro"]
+COLS_PROM = ["proveedor_id", "proveedor", "marca_id", "marca", "precio_promedio"]
+
+# Puntuación y espacios antes que dígitos y letras, como en la intercalación UCA
+_PUNCT = "".join(sorted(c for c in map(chr, range(0x20, 0x7F)) if not c.isalnum()))
+_PUNCT_TABLE = str.maketrans({c: chr(1 + i) for i, c in enumerate(_PUNCT)})
+
+# Clave de comparación/orden que aproxima utf8mb4_0900_ai_ci (la intercalación por
+# defecto de MySQL 8): sin acentos ni mayúsculas y sin ignorar espacios finales
+def _collate_key(v):
+    if not isinstance(v, str):
+        return v
+    v = "".join(c for c in unicodedata.normalize("NFKD", v) if not unicodedata.combining(c))
+    return v.casefold().translate(_PUNCT_TABLE)
+
+# UPPER(col) IN (...) con la intercalación de MySQL; se evalúa por valor distinto
+def _ci_isin(s: pd.Series, values) -> pd.Series:
+    targets = {_collate_key(v) for v in values}
+    return s.isin([u for u in s.dropna().unique() if _collate_key(u) in targets])
+
+# ROUND(x, n) de MySQL: DECIMAL redondea hacia afuera; DOUBLE usa rint
+def _mysql_round(v, places: int):
+    if v is None:
+        return None
+    if isinstance(v, float):
+        return float(np.rint(v * 10 ** places) / 10 ** places)
+    return Decimal(v).quantize(Decimal(1).scaleb(-places), rounding=ROUND_HALF_UP)
+
+# precio * factor con los tipos de MySQL (literal DECIMAL: DECIMAL exacto, salvo DOUBLE)
+def _mysql_mul(v, factor: str):
+    if v is None:
+        return None
+    return v * float(factor) if isinstance(v, float) else Decimal(v) * Decimal(factor)
+
+# AVG de MySQL: sobre DECIMAL la escala sube 4 dígitos (div_precision_increment)
+def _mysql_avg(total, n: int, scale: int):
+    if not n:
+        return None
+    if isinstance(total, float):
+        return total / n
+    with localcontext() as ctx:
+        ctx.prec = 80
+        return (Decimal(int(total) if isinstance(total, np.integer) else total) / n).quantize(Decimal(1).scaleb(-(scale + 4)), rounding=ROUND_HALF_UP)
+
+def _scale(v) -> int:
+    return -v.as_tuple().exponent if isinstance(v, Decimal) else 0
+
+# ORDER BY de MySQL: NULL primero en ASC y último en DESC, texto con _collate_key
+def _order_by(df: pd.DataFrame, *keys) -> pd.DataFrame:
+    if df.empty:
+        return df
+    tmp, by, asc = {}, [], []
+    for i, (col, up) in enumerate(keys):
+        s = df[col]
+        null = s.isna()
+        v = s.map(_collate_key, na_action="ignore") if s.dtype == object else s
+        tmp[f"n{i}"] = (~null).astype(int)
+        tmp[f"v{i}"] = v.where(~null, "" if s.dtype == object else 0)
+        by += [f"n{i}", f"v{i}"]
+        asc += [up, up]
+    order = pd.DataFrame(tmp, index=df.index).sort_values(by, ascending=asc, kind="mergesort").index
+    return df.loc[order].reset_index(drop=True)
+
+# Acumula los cinco datasets lote a lote; en memoria quedan solo las filas de salida
+# y los agregados por proveedor / proveedor+marca. Con track=True además guarda por
+# repuesto lo necesario para restar su versión anterior (modo incremental, ver remove)
+class SinglePass:
+    def __init__(self, corte=None, track: bool = False):
+        self.corte = corte
+        # repuesto_id -> fila de salida. Autofix guarda todos los candidatos del
+        # proveedor: el filtro de fecha depende de CURDATE() y se aplica en frames()
+        self.rows = {"autofix": {}, "inc15": {}, "recargo": {}}
+        self.prov = {}   # proveedor_id -> [nombre, total, sin_descripcion]
+        self.top = {}    # proveedor_id -> [precio máximo, {repuesto_id: fila}]
+        self.prom = {}   # (proveedor_id, marca_id) -> [proveedor, marca, suma, n con precio, filas]
+        self.scale = 0
+        self.index = {} if track else None  # repuesto_id -> (proveedor_id, marca_id, sin_descripcion, precio)
+        self.dirty = set()  # proveedores cuyo más caro hay que volver a buscar
+
+    def feed(self, keys: list, rows: list) -> None:
+        if not rows:
+            return
+        df = pd.DataFrame.from_records(rows, columns=keys, coerce_float=False)
+        pos = {k: i for i, k in enumerate(keys)}
+        precio = pd.to_numeric(df["precio"], errors="coerce")
+        con_prov = df["proveedor_id"].notna()
+        con_marca = df["marca_id"].notna()
+        first = df["precio"].dropna()
+        if len(first):
+            self.scale = max(self.scale, _scale(first.iloc[0]))
+
+        def pick(mask, cols):
+            idx = [pos[c] for c in cols]
+            return {rows[i][pos["repuesto_id"]]: tuple(rows[i][j] for j in idx) for i in np.flatnonzero(mask.to_numpy())}
+
+        # 1) Autofix (el filtro por fecha se aplica al armar la salida)
+        base = ["repuesto_id", "codigo", "descripcion", "marca", "proveedor", "precio"]
+        self.rows["autofix"].update(pick(con_prov & _ci_isin(df["proveedor"], PROV_AUTOFIX),
+                                         base + ["fecha_ultima_actualizacion"]))
+        # 2) +15% para las marcas elegidas
+        self.rows["inc15"].update({k: r + (_mysql_round(_mysql_mul(r[-1], "1.15"), 2),)
+                                   for k, r in pick(con_marca & _ci_isin(df["marca"], MARCAS_15), base).items()})
+        # 3) +30% para Autorepuestos Express / Automax entre 50k y 100k
+        lo, hi = RANGO_RECARGO_30
+        m30 = con_prov & _ci_isin(df["proveedor"], PROV_RECARGO_30) & (precio > lo) & (precio < hi)
+        self.rows["recargo"].update({k: r + (_mysql_round(_mysql_mul(r[-1], "1.30"), 2),)
+                                     for k, r in pick(m30, base).items()})
+
+        desc = df["descripcion"]
+        vacia = desc.isna() | (desc.astype(str).str.strip(" ") == "")
+        if self.index is not None:
+            self.index.update(zip(df["repuesto_id"].tolist(), zip(
+                [rows[i][pos["proveedor_id"]] for i in range(len(rows))],
+                [rows[i][pos["marca_id"]] for i in range(len(rows))],
+                vacia.tolist(), [rows[i][pos["precio"]] for i in range(len(rows))])))
+
+        # 4) resumen por proveedor: cantidad, sin descripción y el (o los) más caros
+        d = df[con_prov]
+        if len(d):
+            g = pd.DataFrame({"pid": d["proveedor_id"], "vacia": vacia[con_prov], "precio": precio[con_prov]}) \
+                .groupby("pid").agg(total=("vacia", "size"), sin=("vacia", "sum"))
+            nombres = d.groupby("proveedor_id")["proveedor"].last()
+            for pid, t in g.iterrows():
+                acc = self.prov.setdefault(pid, [None, 0, 0])
+                acc[0] = nombres[pid]
+                acc[1] += int(t["total"]); acc[2] += int(t["sin"])
+            maximo = precio.where(con_prov).groupby(df["proveedor_id"]).transform("max")
+            top = con_prov & precio.notna() & (precio == maximo)
+            cols = ["repuesto_id", "codigo", "descripcion", "precio"]
+            for (pid, p), (rid, r) in zip(zip(df["proveedor_id"][top], precio[top]), pick(top, cols).items()):
+                best = self.top.get(pid)
+                if best is None or p > best[0]:
+                    self.top[pid] = [p, {rid: r}]
+                elif p == best[0]:
+                    best[1][rid] = r
+
+        # 5) promedio por marca dentro de cada proveedor
+        d = df[con_prov & con_marca]
+        if len(d):
+            # suma exacta: Decimal + Decimal (o float + float si la columna es DOUBLE)
+            g = pd.DataFrame({"pid": d["proveedor_id"], "mid": d["marca_id"], "precio": d["precio"]}) \
+                .groupby(["pid", "mid"])["precio"].agg(suma=lambda v: sum(v.dropna()), n="count", filas="size")
+            nombres = d.groupby(["proveedor_id", "marca_id"])[["proveedor", "marca"]].last()
+            for key, t in g.iterrows():
+                acc = self.prom.setdefault(key, [None, None, None, 0, 0])
+                acc[0], acc[1] = nombres.loc[key, "proveedor"], nombres.loc[key, "marca"]
+                acc[4] += int(t["filas"])
+                if t["n"]:
+                    acc[2] = t["suma"] if acc[2] is None else acc[2] + t["suma"]
+                    acc[3] += int(t["n"])
+
+    # Resta la versión anterior de estos repuestos (antes de volver a sumarlos con feed)
+    def remove(self, ids) -> int:
+        n = 0
+        for rid in ids:
+            old = self.index.pop(rid, None)
+            if old is None:
+                continue
+            n += 1
+            pid, mid, vacia, precio = old
+            for rows in self.rows.values():
+                rows.pop(rid, None)
+            if pid is None:
+                continue
+            acc = self.prov.get(pid)
+            if acc is not None:
+                acc[1] -= 1; acc[2] -= int(vacia)
+                if acc[1] <= 0:
+                    del self.prov[pid]
+                    self.top.pop(pid, None)
+            best = self.top.get(pid)
+            if best is not None and best[1].pop(rid, None) is not None and not best[1]:
+                # era el único más caro: hay que buscar el nuevo máximo
+                del self.top[pid]
+                self.dirty.add(pid)
+            acc = self.prom.get((pid, mid)) if mid is not None else None
+            if acc is not None:
+                acc[4] -= 1
+                if precio is not None:
+                    acc[2] -= precio; acc[3] -= 1
+                    if not acc[3]:
+                        acc[2] = None
+                if acc[4] <= 0:
+                    del self.prom[(pid, mid)]
+        return n
+
+    # Más caro de los proveedores marcados en remove, consultado solo para esos proveedores
+    def refresh_top(self, conn) -> None:
+        for pid in sorted(self.dirty & set(self.prov)):
+            rows = conn.execute(text(SQL_MAS_CARO_PROVEEDOR), {"pid": pid}).all()
+            self.top.pop(pid, None)
+            for rid, codigo, descripcion, p in rows:
+                best = self.top.setdefault(pid, [float(p), {}])
+                best[1][rid] = (rid, codigo, descripcion, p)
+        self.dirty.clear()
+
+    def frames(self) -> dict[str, pd.DataFrame]:
+        rec = lambda rows, cols: pd.DataFrame.from_records(list(rows), columns=cols, coerce_float=True)
+        autofix = rec(self.rows["autofix"].values(), COLS_AUTOFIX)
+        fecha = pd.to_datetime(autofix["fecha_ultima_actualizacion"], errors="coerce")
+        autofix = autofix[(fecha.isna() | (fecha.dt.normalize() < pd.Timestamp(self.corte))).to_numpy()]
+        resumen = [(int(pid), nombre, total, Decimal(sin)) + r
+                   for pid, (nombre, total, sin) in self.prov.items()
+                   for r in self.top.get(pid, (None, {}))[1].values()]
+        prom = [(int(pid), prov, int(mid), marca, _mysql_round(_mysql_avg(suma, n, self.scale), 2))
+                for (pid, mid), (prov, marca, suma, n, _) in self.prom.items()]
+        return {
+            "autofix": _order_by(autofix.reset_index(drop=True), ("precio_actual", False), ("repuesto_id", True)),
+            "inc15": _order_by(rec(self.rows["inc15"].values(), COLS_INC_15), ("marca", True), ("codigo", True), ("repuesto_id", True)),
+            "recargo": _order_by(rec(self.rows["recargo"].values(), COLS_RECARGO_30),
+                                 ("proveedor", True), ("precio_actual", False), ("repuesto_id", True)),
+            "resumen": _order_by(rec(resumen, COLS_RESUMEN), ("proveedor", True), ("repuesto_id_mas_caro", True)),
+            "prom": _order_by(rec(prom, COLS_PROM), ("proveedor", True), ("marca", True), ("proveedor_id", True), ("marca_id", True)),
+        }
+
+def run_single_pass(engine, chunksize: int = 50_000) -> dict[str, pd.DataFrame]:
+    t = time.perf_counter()
+    with engine.connect() as conn:
+        corte = conn.execute(text(SQL_CORTE_ULTIMO_MES)).scalar()
+        sp = SinglePass(corte)
+        result = conn.execution_options(stream_results=True, max_row_buffer=chunksize).execute(text(SQL_REPUESTOS_JOIN))
+        keys = list(result.keys())
+        n = 0
+        for rows in result.partitions(chunksize):
+            sp.feed(keys, rows)
+            n += len(rows)
+    print(f"[TIEMPO] recorrido único: {time.perf_counter() - t:.2f}s ({n:,} filas de Repuesto)")
+    return sp.frames()
+
+# ---------------- Modo incremental ----------------
+# Estado local (pickle): agregados del recorrido único por repuesto + watermark por
+# proveedor (último Actualizacion.id / fecha procesados) y el máximo id global. La
+# primera corrida (o --full) recorre todo Repuesto; las siguientes traen solo los
+# repuestos cuya última actualización tiene id mayor al máximo procesado (filtrado en
+# la consulta), restan su versión anterior y suman la nueva.
+# Lo que no pasa por Actualizacion (repuestos borrados, cambios sin actualización nueva,
+# renombres de Proveedor/Marca) solo se refleja con --full.
+
+STATE_VERSION = 1
 
-    df_inc15 = pd.read_sql(SQL_INC_15, con=engine)
-    to_csv(df_inc15, outdir / "precio_propuesto_15_marcas_seleccionadas.csv")
+def load_state(path: Path):
+    try:
+        with open(path, "rb") as f:
+            state = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return None
+    return state if state.get("version") == STATE_VERSION else None
 
-    df_recargo = pd.read_sql(SQL_RECARGO_30, con=engine)
-    to_csv(df_recargo, outdir / "recargo_30_autorepuestos_automax_50k_100k.csv")
+def save_state(path: Path, sp: SinglePass, watermarks: dict, max_id) -> None:
+    state = {"version": STATE_VERSION, "watermarks": watermarks, "max_id": max_id,
+             "saved": time.strftime("%Y-%m-%d %H:%M:%S"),
+             "agg": {k: v for k, v in sp.__dict__.items() if k != "corte"}}
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
 
-    df_resumen = pd.read_sql(SQL_RESUMEN_PROV, con=engine)
+def run_incremental(engine, state_path: Path, chunksize: int = 50_000, full: bool = False) -> dict[str, pd.DataFrame]:
+    t = time.perf_counter()
+    state = None if full else load_state(state_path)
+    if state is None:
+        sp, watermarks, max_id = SinglePass(track=True), {}, None
+        sql, params = SQL_REPUESTOS_JOIN, {}
+    else:
+        sp = SinglePass(track=True)
+        sp.__dict__.update(state["agg"])
+        watermarks, max_id = state["watermarks"], state["max_id"]
+        # los ids de Actualizacion crecen para todos los proveedores: el máximo global
+        # procesado alcanza como cota y la consulta trae solo lo que cambió
+        sql, params = SQL_REPUESTOS_CAMBIOS, {"desde": max_id or 0}
+    n = cambiados = 0
+    with engine.connect() as conn:
+        sp.corte = conn.execute(text(SQL_CORTE_ULTIMO_MES)).scalar()
+        result = conn.execution_options(stream_results=True, max_row_buffer=chunksize).execute(text(sql), params)
+        keys = list(result.keys())
+        i_id, i_prov, i_fecha = (keys.index(k) for k in ("actualizacion_id", "actualizacion_proveedor_id", "fecha_ultima_actualizacion"))
+        for rows in result.partitions(chunksize):
+            if state is not None:
+                cambiados += sp.remove(r[0] for r in rows)
+            n += len(rows)
+            sp.feed(keys, rows)
+            for r in rows:
+                if r[i_id] is None:
+                    continue
+                w = watermarks.setdefault(r[i_prov], {"id": r[i_id], "fecha": r[i_fecha]})
+                if r[i_id] > w["id"]:
+                    w["id"], w["fecha"] = r[i_id], r[i_fecha]
+                max_id = r[i_id] if max_id is None else max(max_id, r[i_id])
+        sp.refresh_top(conn)
+    save_state(state_path, sp, watermarks, max_id)
+    if state is None:
+        print(f"[INCREMENTAL] recorrido completo: {n:,} repuestos; estado -> {state_path}")
+    else:
+        print(f"[INCREMENTAL] {n:,} repuestos con actualización posterior al watermark "
+              f"({cambiados:,} ya conocidos, {n - cambiados:,} nuevos)")
+    print(f"[TIEMPO] incremental: {time.perf_counter() - t:.2f}s")
+    return sp.frames()
+
+# ---------------- Perfil de consultas (--profile) ----------------
+# EXPLAIN ANALYZE (MySQL 8.0.18+) de las consultas del modo sql (QUERIES y el resumen con
+# ventanas; EXPLAIN ANALYZE las ejecuta, así que no se perfilan las del recorrido único
+# ni se repiten las sargables): tiempo real, filas examinadas por los accesos a tablas, recorridos completos, tablas temporales y ordenamientos. Si el
+# servidor no lo soporta se usa EXPLAIN común (filas estimadas). Después revisa los
+# índices sugeridos (--create_indexes los crea) y compara cada reescritura sargable
+# contra la consulta original.
+
+# (tabla, nombre, columnas, para qué)
+SUGGESTED_INDEXES = [
+    ("Repuesto", "idx_repuesto_proveedor_precio", ("proveedor_id", "precio"),
+     "MAX(precio) por proveedor y el join de vuelta del resumen; rango de precio del recargo"),
+    ("Repuesto", "idx_repuesto_marca", ("id_marca",), "join desde Marca en el +15% y el promedio por marca"),
+    ("Actualizacion", "idx_actualizacion_fecha", ("fecha",), "filtro de fecha de Autofix (versión sargable)"),
+]
+
+_ACCESS = ("Table scan on", "Index scan on", "Index lookup on", "Single-row index lookup on",
+           "Index range scan on", "Covering index", "Full-text index", "Index unique")
+_ACTUAL = re.compile(r"\(actual time=[\d.e+-]+\.\.([\d.e+-]+) rows=([\d.e+-]+) loops=(\d+)\)")
+
+# Resume el árbol de EXPLAIN ANALYZE
+def _analyze_stats(plan: str) -> dict:
+    st = {"seconds": None, "rows_examined": 0, "full_scans": [], "temp_tables": 0, "sorts": 0}
+    for line in plan.splitlines():
+        node = line.strip().lstrip("-> ")
+        m = _ACTUAL.search(node)
+        if m and st["seconds"] is None:
+            st["seconds"] = float(m.group(1)) / 1000  # el nodo raíz: ms hasta la última fila
+        if node.startswith(_ACCESS) and m:
+            st["rows_examined"] += int(float(m.group(2)) * int(m.group(3)))
+        if node.startswith("Table scan on"):
+            alias = node.split()[3]
+            if alias not in st["full_scans"] and not alias.startswith("<"):  # <temporary>, <subquery> no son tablas
+                st["full_scans"].append(alias)
+        if node.startswith(("Materialize", "Temporary table")) or "using temporary" in node.lower():
+            st["temp_tables"] += 1
+        if node.startswith("Sort"):
+            st["sorts"] += 1
+    return st
+
+# Resume EXPLAIN tradicional (type=ALL es recorrido completo; filas estimadas)
+def _explain_stats(rows: list[dict]) -> dict:
+    st = {"seconds": None, "rows_examined": 0, "full_scans": [], "temp_tables": 0, "sorts": 0}
+    for r in rows:
+        r = {k.lower(): v for k, v in r.items()}
+        st["rows_examined"] += int(r.get("rows") or 0)
+        if r.get("type") == "ALL" and not str(r.get("table", "")).startswith("<"):
+            st["full_scans"].append(r["table"])
+        extra = r.get("extra") or ""
+        st["temp_tables"] += "Using temporary" in extra
+        st["sorts"] += "Using filesort" in extra
+    return st
+
+def explain(conn, sql: str) -> tuple[str, dict]:
+    q = sql.strip().rstrip(";")
+    try:
+        plan = "\n".join(r[0] for r in conn.execute(text("EXPLAIN ANALYZE " + q)))
+        return plan, _analyze_stats(plan)
+    except DBAPIError:
+        conn.rollback()
+        rows = [dict(r._mapping) for r in conn.execute(text("EXPLAIN " + q))]
+        plan = "\n".join(" | ".join(f"{k}={v}" for k, v in r.items()) for r in rows)
+        return plan, _explain_stats(rows)
+
+# Índices existentes por tabla: {tabla: [(col1, col2, ...), ...]}
+def existing_indexes(conn) -> dict[str, list[tuple]]:
+    rows = conn.execute(text(
+        "SELECT TABLE_NAME, INDEX_NAME, COLUMN_NAME FROM information_schema.STATISTICS "
+        "WHERE TABLE_SCHEMA = DATABASE() ORDER BY TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX")).all()
+    idx = {}
+    for table, name, col in rows:
+        if col is None:  # índice funcional (expresión, sin columna)
+            continue
+        idx.setdefault(table.lower(), {}).setdefault(name, []).append(col.lower())
+    return {t: [tuple(c) for c in v.values()] for t, v in idx.items()}
+
+# Qué reescrituras sargables son equivalentes con este esquema
+def sargable_ok(conn) -> dict[str, str | None]:
+    cols = {(t.lower(), c.lower()): (dt, coll) for t, c, dt, coll in conn.execute(text(
+        "SELECT TABLE_NAME, COLUMN_NAME, DATA_TYPE, COLLATION_NAME FROM information_schema.COLUMNS "
+        "WHERE TABLE_SCHEMA = DATABASE()")).all()}
+    ci = lambda t: (cols.get((t, "nombre"), (None, None))[1] or "").endswith("_ci")
+    motivo = {}
+    fecha = (cols.get(("actualizacion", "fecha"), (None, None))[0] or "").lower()
+    motivo["autofix"] = (None if ci("proveedor") and fecha in ("date", "datetime", "timestamp")
+                         else "Proveedor.nombre sin intercalación _ci o Actualizacion.fecha no es DATE/DATETIME")
+    motivo["inc15"] = None if ci("marca") else "Marca.nombre sin intercalación _ci"
+    motivo["recargo"] = None if ci("proveedor") else "Proveedor.nombre sin intercalación _ci"
+    return motivo
+
+def profile(engine, outdir: Path, create_indexes: bool = False) -> list[dict]:
+    report, plans = [], []
+    sqls = {**QUERIES, "resumen_ventana": SQL_RESUMEN_VENTANA}
+    stats = {}
+    with engine.connect() as conn:
+        total = conn.execute(text("SELECT COUNT(*) FROM Repuesto")).scalar()
+
+        for name, sql in sqls.items():
+            t = time.perf_counter()
+            plan, st = explain(conn, sql)
+            if st["seconds"] is None:
+                st["seconds"] = time.perf_counter() - t
+            st["query"] = name
+            stats[name] = st
+            report.append(st)
+            plans.append(f"===== {name} =====\n{plan}\n")
+            alerta = " <- recorre Repuesto completo" if "r" in st["full_scans"] or "Repuesto" in st["full_scans"] else ""
+            print(f"[PERFIL] {name:<26} {st['seconds']:7.3f}s  filas examinadas {st['rows_examined']:>12,}  "
+                  f"full scan: {', '.join(st['full_scans']) or '-'}  temporales: {st['temp_tables']}  "
+                  f"sort: {st['sorts']}{alerta}")
+        print(f"[PERFIL] Repuesto: {total:,} filas")
+
+        # Índices sugeridos que no están cubiertos por uno existente (mismas columnas al principio)
+        idx = existing_indexes(conn)
+        faltan = [s for s in SUGGESTED_INDEXES
+                  if not any(cols[:len(s[2])] == s[2] for cols in idx.get(s[0].lower(), []))]
+        for table, name, cols, motivo in SUGGESTED_INDEXES:
+            estado = "FALTA" if (table, name, cols, motivo) in faltan else "ok"
+            print(f"[INDICE] {estado:<5} {table}({', '.join(cols)}): {motivo}")
+        for table, name, cols, _ in faltan:
+            ddl = f"CREATE INDEX {name} ON {table} ({', '.join(cols)})"
+            if create_indexes:
+                t = time.perf_counter()
+                conn.execute(text(ddl))
+                conn.commit()
+                print(f"[INDICE] creado {name} en {time.perf_counter() - t:.2f}s")
+            else:
+                print(f"[INDICE] sugerido: {ddl};  (--create_indexes para crearlo)")
+
+        # Reescrituras sargables: mismo resultado y cuánto cambia el plan
+        motivos = sargable_ok(conn)
+        for key, sql in SARGABLE.items():
+            if motivos[key]:
+                print(f"[SARGABLE] {key}: no equivalente con este esquema ({motivos[key]})")
+                continue
+            antes = stats[key]
+            plan, despues = explain(conn, sql)
+            plans.append(f"===== {key} (sargable) =====\n{plan}\n")
+            igual = pd.read_sql(text(QUERIES[key]), conn).equals(pd.read_sql(text(sql), conn))
+            print(f"[SARGABLE] {key}: {'mismo resultado' if igual else 'RESULTADO DISTINTO'}; "
+                  f"filas examinadas {antes['rows_examined']:,} -> {despues['rows_examined']:,}, "
+                  f"{antes['seconds']:.3f}s -> {despues['seconds']:.3f}s (usar con --sargable)")
+
+    path = outdir / "perfil_consultas.txt"
+    path.write_text("\n".join(plans), encoding="utf-8")
+    print(f"[OK] planes -> {path}")
+    return report
+
+# Escribe los tres CSV de filas y el resumen (resumen por proveedor + promedios por marca)
+def write_outputs(frames: dict[str, pd.DataFrame], outdir: Path, compression: str = "none") -> None:
+    for key, df in frames.items():
+        write_dataset(key, df, outdir, compression)
+    write_resumen(frames, outdir, compression)
+
+# CSV de un dataset de filas (los de resumen se escriben juntos en write_resumen)
+def write_dataset(key: str, df: pd.DataFrame, outdir: Path, compression: str = "none") -> None:
+    if key in OUTPUTS:
+        to_csv(df, outdir / OUTPUTS[key], compression)
+
+def write_resumen(frames: dict[str, pd.DataFrame], outdir: Path, compression: str = "none") -> None:
+    df_resumen = frames["resumen"].copy()
     df_resumen.insert(0, "seccion", "resumen_proveedor")
 
-    df_prom_en_prov = pd.read_sql(SQL_PROM_MARCA_EN_PROV, con=engine)
+    df_prom_en_prov = frames["prom"].copy()
     df_prom_en_prov.insert(0, "seccion", "promedio_por_marca_en_proveedor")
 
     # Normalizamos columnas para concatenar
@@ -167,7 +962,34 @@ def main():
     )[cols]
 
     df_unico = pd.concat([df_resumen, df_prom_en_prov], ignore_index=True)
-    to_csv(df_unico, outdir / "resumen_proveedor.csv")
+    to_csv(df_unico, outdir / "resumen_proveedor.csv", compression)
+
+# Main 
+
+def main():
+    args = parse_args()
+    outdir = ensure_outdir(args.outdir)
+    engine = make_engine(args)
+    use_backend(args.backend)
+
+    if args.profile:
+        profile(engine, outdir, args.create_indexes)
+        return
+    if args.sargable:
+        QUERIES.update(SARGABLE)
+
+    t0 = time.perf_counter()
+    if args.mode == "single":
+        write_outputs(run_single_pass(engine, args.chunksize), outdir, args.compress)
+    elif args.mode == "incremental":
+        state = Path(args.state_file) if args.state_file else outdir / ".etl_incremental.pkl"
+        write_outputs(run_incremental(engine, state, args.chunksize, args.full), outdir, args.compress)
+    else:
+        frames = run_sql(engine, args.workers, on_ready=lambda key, df: write_dataset(key, df, outdir, args.compress),
+                         stream_dir=outdir if args.stream else None, chunksize=args.chunksize,
+                         compression=args.compress, summary=args.summary)
+        write_resumen(frames, outdir, args.compress)
+    print(f"[TIEMPO] total: {time.perf_counter() - t0:.2f}s")
 
     print("\nHecho. CSVs generados en:", outdir.resolve())
 